@@ -12,12 +12,45 @@ from kivy.uix.textinput import TextInput
 from kivy.uix.scrollview import ScrollView
 from kivy.uix.gridlayout import GridLayout
 from kivy.uix.popup import Popup
-from kivy.properties import StringProperty, BooleanProperty, ObjectProperty
+from kivy.uix.filechooser import FileChooserIconView
+from kivy.uix.relativelayout import RelativeLayout
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
+from kivy.graphics import Color, Mesh
+from kivy.properties import StringProperty, BooleanProperty, ObjectProperty, NumericProperty
 from kivy.clock import Clock
 from kivy.core.window import Window
+from kivy.core.clipboard import Clipboard
 from typing import Optional, Callable
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial, wraps
+import atexit
+import logging
+import logging.handlers
+import platform
+import queue
+import shutil
+import subprocess
+import sys
 import threading
+import time
 import os
+from weakref import ref
+
+from Server import (
+    Peer,
+    register_with_tracker,
+    get_peers_from_tracker,
+    announce_video_to_tracker,
+    post_heartbeat,
+    format_file_size,
+    load_all_profiles,
+    save_profile,
+    load_profile,
+    delete_profile,
+    add_friend,
+    remove_friend,
+    get_friends
+)
 
 # Try to import filechooser
 try:
@@ -25,7 +58,174 @@ try:
     HAS_PLYER = True
 except ImportError:
     HAS_PLYER = False
-    from kivy.uix.filechooser import FileChooserIconView
+
+# Accepted video extensions and the file chooser filters built from them
+_VIDEO_EXTS = ('.mp4', '.avi', '.mov', '.mkv', '.flv')
+_KIVY_VIDEO_FILTERS = ['*' + ext for ext in _VIDEO_EXTS]
+_PLYER_VIDEO_FILTERS = [("Video files", ';'.join(_KIVY_VIDEO_FILTERS))]
+
+# App messages go through a queue and are written to stdout by a listener
+# thread, so logging from the UI thread never blocks on the stdout lock
+_log_queue = queue.SimpleQueue()
+_log_handler = logging.StreamHandler(sys.stdout)
+_log_handler.setFormatter(logging.Formatter('%(message)s'))
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_handler)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+log = logging.getLogger('p2p')
+log.setLevel(logging.INFO)
+log.addHandler(logging.handlers.QueueHandler(_log_queue))
+log.propagate = False  # Kivy's own handlers would print it a second time
+
+
+# Background I/O (uploads, downloads, tracker and peer requests) runs on one
+# bounded pool instead of a new thread per action
+_IO_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix='p2p-io')
+
+# Tasks submitted to the pool and not yet finished, so shutdown can cancel
+# the queued ones
+_io_tasks = set()
+_io_tasks_lock = threading.Lock()
+
+
+def _log_task_error(future):
+    """Log an exception from a pooled task, which the pool would otherwise keep"""
+    with _io_tasks_lock:
+        _io_tasks.discard(future)
+    if not future.cancelled() and future.exception() is not None:
+        log.error("Background task failed", exc_info=future.exception())
+
+
+def run_in_background(fn, *args):
+    """Run fn(*args) on the I/O pool"""
+    future = _IO_POOL.submit(fn, *args)
+    with _io_tasks_lock:
+        _io_tasks.add(future)
+    future.add_done_callback(_log_task_error)
+    return future
+
+
+def cancel_background_tasks():
+    """Cancel queued I/O tasks and let running ones finish on their own"""
+    with _io_tasks_lock:
+        pending = list(_io_tasks)
+    for future in pending:
+        # Only succeeds for tasks that haven't started
+        future.cancel()
+    _IO_POOL.shutdown(wait=False)
+
+
+# Widget updates requested from any thread are queued here and drained on
+# the Kivy main thread, all calls made during one frame in a single tick
+_ui_calls = queue.SimpleQueue()
+
+
+def _drain_ui_calls(dt):
+    """Run every queued UI call"""
+    while True:
+        try:
+            call = _ui_calls.get_nowait()
+        except queue.Empty:
+            return
+        call()
+
+
+_drain_ui_trigger = Clock.create_trigger(_drain_ui_calls, 0)
+
+
+def on_ui(fn):
+    """
+    Decorator for methods that touch widgets: the call is queued and run on
+    the Kivy main thread, so it is safe to make from peer/tracker threads
+    """
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        _ui_calls.put(partial(fn, *args, **kwargs))
+        _drain_ui_trigger()
+    return wrapper
+
+
+_HAS_COPY_FILE_RANGE = hasattr(os, 'copy_file_range')
+
+
+def _copy_video(source_path, save_path):
+    """
+    Copy a video like shutil.copy2, but with copy_file_range where the OS
+    has it so same-filesystem copies can be done (or reflinked) in the kernel
+    """
+    if _HAS_COPY_FILE_RANGE:
+        try:
+            with open(source_path, 'rb') as src, open(save_path, 'wb') as dst:
+                remaining = os.fstat(src.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(src.fileno(), dst.fileno(), remaining)
+                    if not copied:
+                        break
+                    remaining -= copied
+            if remaining <= 0:
+                shutil.copystat(source_path, save_path)
+                return
+        except OSError:
+            # e.g. EXDEV/ENOSYS on older kernels; copy2 below starts over
+            pass
+    shutil.copy2(source_path, save_path)
+
+
+class VideoState:
+    """What the app knows about one video in the peer's library"""
+    
+    __slots__ = ('uploaded', 'on_network', 'source_peer')
+    
+    def __init__(self, uploaded=False, on_network=False, source_peer=None):
+        self.uploaded = uploaded        # Added by this user
+        self.on_network = on_network    # Announced to the tracker
+        self.source_peer = source_peer  # "host:port" it was downloaded from
+
+
+# How long a fetched tracker peer list is trusted for (host, port) lookups
+_PEER_CACHE_TTL = 5.0
+
+# The tracker drops peers it hasn't heard from in 5 minutes
+_HEARTBEAT_INTERVAL = 60.0
+
+
+def _uploaded_row(video_id, video_name, size, is_on_network=False):
+    """Build the RecycleView data entry for an uploaded video"""
+    return {
+        'video_id': video_id,
+        'video_name': video_name,
+        'size_bytes': size,
+        'size_str': format_file_size(size),
+        'is_on_network': is_on_network
+    }
+
+
+def _downloaded_row(video_id, video_name, size, peer_info):
+    """Build the RecycleView data entry for a downloaded video"""
+    return {
+        'video_id': video_id,
+        'video_name': video_name,
+        'size_bytes': size,
+        'size_str': format_file_size(size),
+        'peer_info': peer_info
+    }
+
+
+def _network_row(video, peer_host, peer_port):
+    """Build the RecycleView data entry for a video offered by another peer"""
+    return {
+        'video_id': video['id'],
+        'video_name': video['name'],
+        'size_str': format_file_size(video['size']),
+        'peer_host': peer_host,
+        'peer_port': peer_port
+    }
+
+
+def _peer_row(peer_id, host, port, is_friend=False):
+    """Build the RecycleView data entry for a connected user or friend"""
+    return {'peer_id': peer_id, 'host': host, 'port': port, 'is_friend': is_friend}
 
 
 class SettingsPopup(Popup):
@@ -33,6 +233,7 @@ class SettingsPopup(Popup):
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
+        self._app = App.get_running_app()
         self.title = "⚙️ Settings"
         self.size_hint = (0.8, 0.7)
         
@@ -64,6 +265,11 @@ class SettingsPopup(Popup):
         
         # Current settings display
         self.current_settings = Label(text='', size_hint_y=0.3)
+        self._shown_settings = None
+        
+        # Window color/size changes are applied together on the next frame
+        self._window_state = {}
+        self._window_trigger = Clock.create_trigger(self._flush_window_state)
         content.add_widget(self.current_settings)
         
         # Close button
@@ -76,42 +282,682 @@ class SettingsPopup(Popup):
     
     def set_light_mode(self, instance):
         """Set light mode theme"""
-        app = App.get_running_app()
+        app = self._app
+        if app.theme_mode == 'light':
+            return
         app.theme_mode = 'light'
-        Window.clearcolor = (1, 1, 1, 1)
+        self._set_window(clearcolor=(1, 1, 1, 1))
         app.update_theme_colors()
         self.update_display()
     
     def set_dark_mode(self, instance):
         """Set dark mode theme"""
-        app = App.get_running_app()
+        app = self._app
+        if app.theme_mode == 'dark':
+            return
         app.theme_mode = 'dark'
-        Window.clearcolor = (0.1, 0.1, 0.1, 1)
+        self._set_window(clearcolor=(0.1, 0.1, 0.1, 1))
         app.update_theme_colors()
         self.update_display()
     
     def set_pc_format(self, instance):
         """Set PC display format"""
-        app = App.get_running_app()
+        app = self._app
+        if app.display_format == 'pc':
+            return
         app.display_format = 'pc'
-        Window.size = (900, 700)
+        self._set_window(size=(900, 700))
         self.update_display()
     
     def set_mobile_format(self, instance):
         """Set mobile display format"""
-        app = App.get_running_app()
+        app = self._app
+        if app.display_format == 'mobile':
+            return
         app.display_format = 'mobile'
-        Window.size = (400, 700)
+        self._set_window(size=(400, 700))
         self.update_display()
     
+    def _set_window(self, **state):
+        """Queue Window property changes for the next frame"""
+        self._window_state.update(state)
+        self._window_trigger()
+    
+    def _flush_window_state(self, dt):
+        """Apply the latest queued Window properties in one pass"""
+        state = self._window_state
+        for name, value in state.items():
+            setattr(Window, name, value)
+        state.clear()
+    
     def update_display(self):
         """Update the current settings display"""
-        app = App.get_running_app()
+        app = self._app
+        settings = (app.theme_mode, app.display_format)
+        # Reopening the popup or re-tapping the active option changes nothing
+        if settings == self._shown_settings:
+            return
+        self._shown_settings = settings
         theme = app.theme_mode.title()
         format_type = app.display_format.upper()
         self.current_settings.text = f'Current: {theme} Mode | {format_type} Format'
 
 
+class VideoInfoPopup(Popup):
+    """Popup for entering a new video's name and description"""
+    
+    def __init__(self, screen, **kwargs):
+        super().__init__(**kwargs)
+        self.screen = screen
+        self.file_path = None
+        self.title = 'Video Information'
+        self.size_hint = (0.8, 0.6)
+        
+        content = BoxLayout(orientation='vertical', padding=10, spacing=10)
+        
+        self.file_label = Label(text='', size_hint_y=0.2)
+        content.add_widget(self.file_label)
+        
+        self.name_input = TextInput(hint_text='Video Name', multiline=False, size_hint_y=0.2)
+        content.add_widget(self.name_input)
+        
+        self.desc_input = TextInput(hint_text='Description (optional)', multiline=True, size_hint_y=0.3)
+        content.add_widget(self.desc_input)
+        
+        button_box = BoxLayout(size_hint_y=0.2, spacing=10)
+        upload_btn = Button(text='Upload')
+        cancel_btn = Button(text='Cancel')
+        upload_btn.bind(on_release=self.upload)
+        cancel_btn.bind(on_release=self.dismiss)
+        button_box.add_widget(upload_btn)
+        button_box.add_widget(cancel_btn)
+        content.add_widget(button_box)
+        
+        self.content = content
+    
+    def show(self, file_path):
+        """Open the popup for the selected file"""
+        file_name = os.path.basename(file_path)
+        self.file_path = file_path
+        self.file_label.text = f'File: {file_name}'
+        self.name_input.text = file_name
+        self.desc_input.text = ''
+        self.open()
+    
+    def upload(self, instance):
+        """Upload the selected file with the entered information"""
+        video_name = self.name_input.text or os.path.basename(self.file_path)
+        description = self.desc_input.text
+        if self.screen.on_upload_video:
+            self.screen.on_upload_video(self.file_path, video_name, description)
+        self.dismiss()
+
+
+class UploadedVideoOptionsPopup(Popup):
+    """Options popup for uploaded videos"""
+    
+    def __init__(self, screen, **kwargs):
+        super().__init__(**kwargs)
+        self.screen = screen
+        self.video_id = None
+        self.video_name = None
+        self.title = 'Video Options'
+        self.size_hint = (0.7, 0.8)
+        
+        content = BoxLayout(orientation='vertical', padding=20, spacing=15)
+        
+        self.header = Label(text='', size_hint_y=0.25, font_size='18sp', bold=True)
+        content.add_widget(self.header)
+        
+        # Play button
+        play_btn = Button(text='▶️ Play Video', size_hint_y=0.15)
+        play_btn.bind(on_release=self.play)
+        content.add_widget(play_btn)
+        
+        # Edit button
+        edit_btn = Button(text='✏️ Edit Info', size_hint_y=0.15)
+        edit_btn.bind(on_release=self.edit)
+        content.add_widget(edit_btn)
+        
+        # Upload to network button and "already on network" label share one
+        # slot; only one of them is visible at a time
+        network_slot = RelativeLayout(size_hint_y=0.15)
+        self.upload_network_btn = Button(text='🌐 Upload to Network')
+        self.upload_network_btn.bind(on_release=self.upload_to_network)
+        self.on_network_label = Label(text='✅ Already on Network', color=(0.4, 1, 0.4, 1))
+        network_slot.add_widget(self.upload_network_btn)
+        network_slot.add_widget(self.on_network_label)
+        content.add_widget(network_slot)
+        
+        # Delete button
+        delete_btn = Button(text='🗑️ Delete', size_hint_y=0.15, background_color=(0.8, 0.2, 0.2, 1))
+        delete_btn.bind(on_release=self.delete)
+        content.add_widget(delete_btn)
+        
+        # Cancel button
+        cancel_btn = Button(text='Cancel', size_hint_y=0.15)
+        cancel_btn.bind(on_release=self.dismiss)
+        content.add_widget(cancel_btn)
+        
+        self.content = content
+    
+    def show(self, video_id, video_name, is_on_network):
+        """Open the popup for a video"""
+        self.video_id = video_id
+        self.video_name = video_name
+        self.header.text = f'Options for:\n{video_name}'
+        self.upload_network_btn.opacity = 0 if is_on_network else 1
+        self.upload_network_btn.disabled = is_on_network
+        self.on_network_label.opacity = 1 if is_on_network else 0
+        self.open()
+    
+    def play(self, instance):
+        self.screen.play_video(self.video_id, self)
+    
+    def edit(self, instance):
+        self.screen.edit_video_info(self.video_id, self.video_name, self)
+    
+    def upload_to_network(self, instance):
+        self.screen.upload_to_network(self.video_id, self)
+    
+    def delete(self, instance):
+        self.screen.confirm_delete_video(self.video_id, self.video_name, self)
+
+
+class DownloadedVideoOptionsPopup(Popup):
+    """Options popup for videos obtained from the network"""
+    
+    def __init__(self, screen, **kwargs):
+        super().__init__(**kwargs)
+        self.screen = screen
+        self.video_id = None
+        self.video_name = None
+        self.title = 'Video Options'
+        self.size_hint = (0.7, 0.7)
+        
+        content = BoxLayout(orientation='vertical', padding=20, spacing=15)
+        
+        self.header = Label(text='', size_hint_y=0.3, font_size='18sp', bold=True)
+        content.add_widget(self.header)
+        
+        # Play button
+        play_btn = Button(text='▶️ Play Video', size_hint_y=0.2)
+        play_btn.bind(on_release=self.play)
+        content.add_widget(play_btn)
+        
+        # Download to device button
+        download_btn = Button(text='💾 Download to Device', size_hint_y=0.2)
+        download_btn.bind(on_release=self.download_to_device)
+        content.add_widget(download_btn)
+        
+        # Delete button
+        delete_btn = Button(text='🗑️ Remove from Library', size_hint_y=0.2, background_color=(0.8, 0.2, 0.2, 1))
+        delete_btn.bind(on_release=self.delete)
+        content.add_widget(delete_btn)
+        
+        # Cancel button
+        cancel_btn = Button(text='Cancel', size_hint_y=0.1)
+        cancel_btn.bind(on_release=self.dismiss)
+        content.add_widget(cancel_btn)
+        
+        self.content = content
+    
+    def show(self, video_id, video_name):
+        """Open the popup for a video"""
+        self.video_id = video_id
+        self.video_name = video_name
+        self.header.text = f'Options for:\n{video_name}'
+        self.open()
+    
+    def play(self, instance):
+        self.screen.play_video(self.video_id, self)
+    
+    def download_to_device(self, instance):
+        self.screen.download_to_device(self.video_id, self.video_name, self)
+    
+    def delete(self, instance):
+        self.screen.confirm_delete_downloaded_video(self.video_id, self.video_name, self)
+
+
+class EditVideoPopup(Popup):
+    """Popup for editing a video's name and description"""
+    
+    def __init__(self, screen, **kwargs):
+        super().__init__(**kwargs)
+        self.screen = screen
+        self.video_id = None
+        self.title = 'Edit Video'
+        self.size_hint = (0.8, 0.6)
+        
+        content = BoxLayout(orientation='vertical', padding=10, spacing=10)
+        
+        content.add_widget(Label(text='Edit Video Information', size_hint_y=0.2, font_size='18sp'))
+        
+        self.name_input = TextInput(hint_text='Video Name', multiline=False, size_hint_y=0.2)
+        content.add_widget(self.name_input)
+        
+        self.desc_input = TextInput(hint_text='Description', multiline=True, size_hint_y=0.3)
+        content.add_widget(self.desc_input)
+        
+        button_box = BoxLayout(size_hint_y=0.2, spacing=10)
+        save_btn = Button(text='💾 Save')
+        cancel_btn = Button(text='Cancel')
+        save_btn.bind(on_release=self.save)
+        cancel_btn.bind(on_release=self.dismiss)
+        button_box.add_widget(save_btn)
+        button_box.add_widget(cancel_btn)
+        content.add_widget(button_box)
+        
+        self.content = content
+    
+    def show(self, video_id, current_name):
+        """Open the popup for a video"""
+        self.video_id = video_id
+        self.name_input.text = current_name
+        self.desc_input.text = ''
+        self.open()
+    
+    def save(self, instance):
+        """Save the edited information"""
+        if self.screen.on_edit_video:
+            self.screen.on_edit_video(self.video_id, self.name_input.text, self.desc_input.text)
+        self.dismiss()
+        self.screen.update_video(self.video_id, video_name=self.name_input.text)
+
+
+class VideoPathPopup(Popup):
+    """Shows where a video is stored when it can't be opened automatically"""
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.video_path = None
+        self.size_hint = (0.8, 0.5)
+        
+        content = BoxLayout(orientation='vertical', padding=20, spacing=15)
+        
+        self.path_label = Label(
+            text='',
+            size_hint_y=0.7,
+            halign='center',
+            valign='middle'
+        )
+        content.add_widget(self.path_label)
+        
+        self.copy_btn = Button(text='📋 Copy Path', size_hint_y=0.15)
+        close_btn = Button(text='Close', size_hint_y=0.15)
+        self.copy_btn.bind(on_release=self.copy_path)
+        close_btn.bind(on_release=self.dismiss)
+        content.add_widget(self.copy_btn)
+        content.add_widget(close_btn)
+        
+        self.content = content
+    
+    def show(self, video_path, video_name):
+        """Open the popup for a video"""
+        self.video_path = video_path
+        self.title = f'Cannot Auto-Open: {video_name}'
+        self.path_label.text = f'Video Location:\n\n{video_path}'
+        self.copy_btn.text = '📋 Copy Path'
+        self.open()
+    
+    def copy_path(self, instance):
+        """Copy the video path to the clipboard"""
+        try:
+            Clipboard.copy(self.video_path)
+            self.copy_btn.text = '✅ Copied!'
+        except:
+            pass
+
+
+class FileChooserPopup(Popup):
+    """Kivy file chooser used when plyer's native dialog is unavailable"""
+    
+    def __init__(self, screen, **kwargs):
+        super().__init__(**kwargs)
+        self.screen = screen
+        self.title = 'Choose Video File'
+        self.size_hint = (0.9, 0.9)
+        
+        content = BoxLayout(orientation='vertical')
+        
+        self.file_chooser = FileChooserIconView(
+            filters=_KIVY_VIDEO_FILTERS
+        )
+        content.add_widget(self.file_chooser)
+        
+        button_box = BoxLayout(size_hint_y=0.1, spacing=10)
+        select_btn = Button(text='Select')
+        cancel_btn = Button(text='Cancel')
+        select_btn.bind(on_release=self.select)
+        cancel_btn.bind(on_release=self.dismiss)
+        button_box.add_widget(select_btn)
+        button_box.add_widget(cancel_btn)
+        content.add_widget(button_box)
+        
+        self.content = content
+    
+    def show(self):
+        """Open the chooser with nothing selected, in the last folder used"""
+        self.file_chooser.selection = []
+        self.open()
+    
+    def select(self, instance):
+        """Hand the selected file to the screen"""
+        if self.file_chooser.selection:
+            self.screen.handle_file_selection(self.file_chooser.selection)
+        self.dismiss()
+
+
+class ConfirmPopup(Popup):
+    """Shared confirmation popup; each show() sets the text and action"""
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.on_confirm: Optional[Callable] = None
+        self.size_hint = (0.7, 0.6)
+        
+        content = BoxLayout(orientation='vertical', padding=20, spacing=15)
+        
+        self.message = Label(text='', size_hint_y=0.7)
+        content.add_widget(self.message)
+        
+        button_box = BoxLayout(size_hint_y=0.3, spacing=10)
+        self.confirm_btn = Button(text='', background_color=(0.8, 0.2, 0.2, 1))
+        cancel_btn = Button(text='Cancel')
+        self.confirm_btn.bind(on_release=self.confirm)
+        cancel_btn.bind(on_release=self.dismiss)
+        button_box.add_widget(self.confirm_btn)
+        button_box.add_widget(cancel_btn)
+        content.add_widget(button_box)
+        
+        self.content = content
+    
+    def show(self, title, body, action_text, on_confirm):
+        """Open the popup with the given text and confirm callback"""
+        self.title = title
+        self.message.text = body
+        self.confirm_btn.text = action_text
+        self.on_confirm = on_confirm
+        self.open()
+    
+    def confirm(self, instance):
+        """Dismiss and run the confirm callback"""
+        self.dismiss()
+        on_confirm, self.on_confirm = self.on_confirm, None
+        if on_confirm:
+            on_confirm()
+
+
+class UserOptionsPopup(Popup):
+    """Options popup for a connected user or friend"""
+    
+    def __init__(self, screen, **kwargs):
+        super().__init__(**kwargs)
+        self.screen = screen
+        self.peer_id = None
+        self.host = None
+        self.port = None
+        self.title = 'User Options'
+        self.size_hint = (0.7, 0.6)
+        
+        content = BoxLayout(orientation='vertical', padding=20, spacing=15)
+        
+        self.header = Label(text='', size_hint_y=0.3, font_size='18sp', bold=True)
+        content.add_widget(self.header)
+        
+        # Connect manually button
+        connect_btn = Button(text='🔗 Connect Manually', size_hint_y=0.2)
+        connect_btn.bind(on_release=self.connect)
+        content.add_widget(connect_btn)
+        
+        # Add/remove friend buttons share one slot; show() puts the right one in
+        self.friend_slot = BoxLayout(size_hint_y=0.2)
+        self.add_friend_btn = Button(text='⭐ Add to Friends')
+        self.add_friend_btn.bind(on_release=self.add_friend)
+        self.remove_friend_btn = Button(
+            text='❌ Remove from Friends',
+            background_color=(0.8, 0.2, 0.2, 1)
+        )
+        self.remove_friend_btn.bind(on_release=self.remove_friend)
+        content.add_widget(self.friend_slot)
+        
+        # Cancel button
+        cancel_btn = Button(text='Cancel', size_hint_y=0.3)
+        cancel_btn.bind(on_release=self.dismiss)
+        content.add_widget(cancel_btn)
+        
+        self.content = content
+    
+    def show(self, peer_id, host, port, is_friend):
+        """Open the popup for a user"""
+        self.peer_id = peer_id
+        self.host = host
+        self.port = port
+        self.header.text = f'Options for:\n{peer_id}'
+        self.friend_slot.clear_widgets()
+        self.friend_slot.add_widget(self.remove_friend_btn if is_friend else self.add_friend_btn)
+        self.open()
+    
+    def connect(self, instance):
+        self.screen.connect_to_user(self.peer_id, self.host, self.port, self)
+    
+    def add_friend(self, instance):
+        self.screen.add_to_friends(self.peer_id, self.host, self.port, self)
+    
+    def remove_friend(self, instance):
+        self.screen.remove_from_friends(self.peer_id, self)
+
+
+class UserMenuPopup(Popup):
+    """Menu for editing or deleting the current user"""
+    
+    def __init__(self, app, **kwargs):
+        super().__init__(**kwargs)
+        self.app = app
+        self.title = 'User Menu'
+        self.size_hint = (0.7, 0.6)
+        
+        self.menu_content = BoxLayout(orientation='vertical', padding=20, spacing=15)
+        
+        # Only shown once a user is loaded
+        self.user_label = Label(text='', size_hint_y=0.3, font_size='18sp', bold=True)
+        
+        # Edit details button
+        edit_btn = Button(text='✏️ Edit User Details', size_hint_y=0.25)
+        edit_btn.bind(on_release=self.edit)
+        self.menu_content.add_widget(edit_btn)
+        
+        # Delete user button
+        delete_btn = Button(
+            text='🗑️ Delete User',
+            size_hint_y=0.25,
+            background_color=(0.8, 0.2, 0.2, 1)
+        )
+        delete_btn.bind(on_release=self.delete)
+        self.menu_content.add_widget(delete_btn)
+        
+        # Cancel button
+        cancel_btn = Button(text='Cancel', size_hint_y=0.2)
+        cancel_btn.bind(on_release=self.dismiss)
+        self.menu_content.add_widget(cancel_btn)
+        
+        self.content = self.menu_content
+    
+    def show(self, peer_id):
+        """Open the menu for the current user"""
+        content = self.menu_content
+        if peer_id:
+            self.user_label.text = f'User: {peer_id}'
+            if self.user_label.parent is None:
+                content.add_widget(self.user_label, index=len(content.children))
+        elif self.user_label.parent is not None:
+            content.remove_widget(self.user_label)
+        self.open()
+    
+    def edit(self, instance):
+        self.app.show_edit_user_dialog(self)
+    
+    def delete(self, instance):
+        self.app.confirm_delete_user(self)
+
+
+class EditUserPopup(Popup):
+    """Dialog for editing the current user's profile"""
+    
+    def __init__(self, app, **kwargs):
+        super().__init__(**kwargs)
+        self.app = app
+        self.title = 'Edit User'
+        self.size_hint = (0.8, 0.7)
+        
+        content = BoxLayout(orientation='vertical', padding=10, spacing=10)
+        
+        content.add_widget(Label(text='Edit User Details', size_hint_y=0.15, font_size='18sp'))
+        
+        self.peer_id_input = TextInput(hint_text='Peer ID', multiline=False, size_hint_y=0.15)
+        content.add_widget(self.peer_id_input)
+        
+        self.port_input = TextInput(hint_text='Port', multiline=False, size_hint_y=0.15)
+        content.add_widget(self.port_input)
+        
+        self.tracker_host_input = TextInput(hint_text='Tracker Host', multiline=False, size_hint_y=0.15)
+        content.add_widget(self.tracker_host_input)
+        
+        self.tracker_port_input = TextInput(hint_text='Tracker Port', multiline=False, size_hint_y=0.15)
+        content.add_widget(self.tracker_port_input)
+        
+        button_box = BoxLayout(size_hint_y=0.15, spacing=10)
+        save_btn = Button(text='💾 Save')
+        cancel_btn = Button(text='Cancel')
+        save_btn.bind(on_release=self.save)
+        cancel_btn.bind(on_release=self.dismiss)
+        button_box.add_widget(save_btn)
+        button_box.add_widget(cancel_btn)
+        content.add_widget(button_box)
+        
+        self.content = content
+    
+    def show(self, peer_id, port, tracker_host, tracker_port):
+        """Open the dialog filled with the current profile"""
+        self.peer_id_input.text = peer_id or ''
+        self.port_input.text = str(port) if port else '5000'
+        self.tracker_host_input.text = tracker_host or 'localhost'
+        self.tracker_port_input.text = str(tracker_port) if tracker_port else '6000'
+        self.open()
+    
+    def save(self, instance):
+        """Save the edited profile"""
+        # Note: Editing requires restart
+        self.app.save_user_details(
+            self.peer_id_input.text,
+            int(self.port_input.text),
+            self.tracker_host_input.text,
+            int(self.tracker_port_input.text)
+        )
+        self.dismiss()
+
+
+class RestartRequiredPopup(Popup):
+    """Message shown after saving changes that need a restart"""
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.title = 'Restart Required'
+        self.size_hint = (0.6, 0.4)
+        
+        content = BoxLayout(orientation='vertical', padding=20, spacing=15)
+        
+        content.add_widget(Label(
+            text='Changes saved!\n\nPlease restart the application\nfor changes to take effect.',
+            size_hint_y=0.7
+        ))
+        
+        ok_btn = Button(text='OK', size_hint_y=0.3)
+        ok_btn.bind(on_release=self.dismiss)
+        content.add_widget(ok_btn)
+        
+        self.content = content
+
+
+class BorderedListMixin:
+    """
+    Layout mixin that outlines every row with one shared line Mesh on the
+    layout's canvas, instead of a Line instruction per row
+    """
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        with self.canvas.before:
+            Color(0.3, 0.3, 0.3, 1)
+            self._border_mesh = Mesh(mode='lines')
+    
+    def _draw_borders(self, rects):
+        """Rebuild the mesh from (x, y, width, height) row rectangles"""
+        vertices = []
+        indices = []
+        for i, (x, y, w, h) in enumerate(rects):
+            r, t = x + w, y + h
+            vertices.extend((x, y, 0, 0, r, y, 0, 0, r, t, 0, 0, x, t, 0, 0))
+            b = i * 4
+            indices.extend((b, b + 1, b + 1, b + 2, b + 2, b + 3, b + 3, b))
+        self._border_mesh.vertices = vertices
+        self._border_mesh.indices = indices
+
+
+class BorderedRecycleBoxLayout(BorderedListMixin, RecycleBoxLayout):
+    """RecycleBoxLayout outlining every data row, visible or not, with one Mesh"""
+    
+    def compute_layout(self, data, flags):
+        super().compute_layout(data, flags)
+        self._draw_borders([(*opt['pos'], *opt['size']) for opt in self.view_opts])
+
+
+class ThemedRow(BoxLayout):
+    """Base for list rows; registers the row's widgets for theme updates"""
+    
+    def on_kv_post(self, base_widget):
+        App.get_running_app().register_themed(self)
+
+
+class UploadedVideoRow(ThemedRow):
+    """Row view for the uploaded videos RecycleView (layout in .kv)"""
+    
+    video_id = StringProperty('')
+    video_name = StringProperty('')
+    size_bytes = NumericProperty(0)
+    size_str = StringProperty('')
+    is_on_network = BooleanProperty(False)
+
+
+class DownloadedVideoRow(ThemedRow):
+    """Row view for the downloaded videos RecycleView (layout in .kv)"""
+    
+    video_id = StringProperty('')
+    video_name = StringProperty('')
+    size_bytes = NumericProperty(0)
+    size_str = StringProperty('')
+    peer_info = StringProperty('')
+
+
+class PeerRow(ThemedRow):
+    """Row view for the connected users and friends RecycleViews (layout in .kv)"""
+    
+    peer_id = StringProperty('')
+    host = StringProperty('')
+    port = NumericProperty(0)
+    is_friend = BooleanProperty(False)
+
+
+class NetworkVideoRow(ThemedRow):
+    """Row view for the network videos RecycleView (layout in .kv)"""
+    
+    video_id = StringProperty('')
+    video_name = StringProperty('')
+    size_str = StringProperty('')
+    peer_host = StringProperty('')
+    peer_port = NumericProperty(0)
+
+
 class PeerConfigScreen(Screen):
     """Screen for peer configuration"""
     
@@ -120,6 +966,15 @@ class PeerConfigScreen(Screen):
         self.peer_started = False
         self.on_start_peer: Optional[Callable] = None
         self.on_load_profile: Optional[Callable] = None
+    
+    def on_kv_post(self, base_widget):
+        """Cache the app and widget references used by the handlers"""
+        self._app = App.get_running_app()
+        self._profiles_list = self.ids.profiles_list
+        self._status_label = self.ids.status_label
+        self._start_button = self.ids.start_button
+        self._peer_id_input = self.ids.peer_id_input
+        self._port_input = self.ids.port_input
         
     def on_enter(self):
         """Called when screen is displayed"""
@@ -127,9 +982,7 @@ class PeerConfigScreen(Screen):
     
     def load_profiles(self):
         """Load existing profiles"""
-        from Server import load_all_profiles
-        
-        self.ids.profiles_list.clear_widgets()
+        self._profiles_list.clear_widgets()
         profiles = load_all_profiles()
         
         for profile in profiles:
@@ -144,11 +997,12 @@ class PeerConfigScreen(Screen):
             text=f"👤 {peer_id}\nPort: {port}",
             size_hint_y=None,
             height=60,
-            on_release=lambda x: self.select_profile(profile)
+            on_release=partial(self.select_profile, profile)
         )
-        self.ids.profiles_list.add_widget(btn)
+        self._app.register_themed(btn)
+        self._profiles_list.add_widget(btn)
     
-    def select_profile(self, profile):
+    def select_profile(self, profile, *args):
         """Select an existing profile"""
         if self.on_load_profile:
             self.on_load_profile(
@@ -160,8 +1014,8 @@ class PeerConfigScreen(Screen):
     
     def start_peer(self):
         """Handle start peer button with new profile"""
-        peer_id = self.ids.peer_id_input.text
-        port = self.ids.port_input.text
+        peer_id = self._peer_id_input.text
+        port = self._port_input.text
         tracker_host = self.ids.tracker_host_input.text
         tracker_port = self.ids.tracker_port_input.text
         
@@ -179,30 +1033,30 @@ class PeerConfigScreen(Screen):
         if self.on_start_peer:
             self.on_start_peer(peer_id, port, tracker_host, tracker_port)
     
+    @on_ui
     def set_peer_started(self):
         """Update UI when peer starts"""
         self.peer_started = True
-        self.ids.status_label.text = "🟢 Peer running"
-        self.ids.start_button.disabled = True
-        self.ids.peer_id_input.disabled = True
-        self.ids.port_input.disabled = True
+        self._status_label.text = "🟢 Peer running"
+        self._start_button.disabled = True
+        self._peer_id_input.disabled = True
+        self._port_input.disabled = True
         
         # Switch to my videos screen
-        app = App.get_running_app()
-        app.root.current = 'my_videos'
+        self._app.root.current = 'my_videos'
     
+    @on_ui
     def show_message(self, message, error=False):
         """Show status message"""
-        self.ids.status_label.text = message
+        self._status_label.text = message
         if error:
-            self.ids.status_label.color = (1, 0, 0, 1)
+            self._status_label.color = (1, 0, 0, 1)
         else:
-            self.ids.status_label.color = (0, 1, 0, 1)
+            self._status_label.color = (0, 1, 0, 1)
     
     def show_settings(self):
         """Show settings popup"""
-        settings = SettingsPopup()
-        settings.open()
+        self._app.show_settings()
 
 
 class MyVideosScreen(Screen):
@@ -215,6 +1069,24 @@ class MyVideosScreen(Screen):
         self.on_edit_video: Optional[Callable] = None
         self.on_upload_to_network: Optional[Callable] = None
         self.on_download_to_device: Optional[Callable] = None
+        
+        # Popups are built once and reused on every open
+        self._video_info_popup = VideoInfoPopup(self)
+        self._uploaded_options_popup = UploadedVideoOptionsPopup(self)
+        self._downloaded_options_popup = DownloadedVideoOptionsPopup(self)
+        self._edit_video_popup = EditVideoPopup(self)
+        self._video_path_popup = VideoPathPopup()
+        # Only needed without plyer, so built on first use
+        self._file_chooser_popup = None
+        
+        # video_id -> (list view, row dict) so single edits patch in place
+        self._video_rows = {}
+    
+    def on_kv_post(self, base_widget):
+        """Cache the app and widget references used by the handlers"""
+        self._app = App.get_running_app()
+        self._uploaded_list = self.ids.uploaded_videos_list
+        self._downloaded_list = self.ids.downloaded_videos_list
     
     def upload_video(self):
         """Handle upload video button - open file chooser"""
@@ -223,10 +1095,10 @@ class MyVideosScreen(Screen):
             try:
                 filechooser.open_file(
                     on_selection=self.handle_file_selection,
-                    filters=[("Video files", "*.mp4;*.avi;*.mov;*.mkv;*.flv")]
+                    filters=_PLYER_VIDEO_FILTERS
                 )
             except Exception as e:
-                print(f"Plyer file chooser error: {e}")
+                log.error("Plyer file chooser error: %s", e)
                 self.show_kivy_file_chooser()
         else:
             # Fallback to Kivy's built-in file chooser
@@ -234,31 +1106,9 @@ class MyVideosScreen(Screen):
     
     def show_kivy_file_chooser(self):
         """Show Kivy's built-in file chooser"""
-        content = BoxLayout(orientation='vertical')
-        
-        file_chooser = FileChooserIconView(
-            filters=['*.mp4', '*.avi', '*.mov', '*.mkv', '*.flv']
-        )
-        content.add_widget(file_chooser)
-        
-        button_box = BoxLayout(size_hint_y=0.1, spacing=10)
-        select_btn = Button(text='Select')
-        cancel_btn = Button(text='Cancel')
-        button_box.add_widget(select_btn)
-        button_box.add_widget(cancel_btn)
-        content.add_widget(button_box)
-        
-        popup = Popup(title='Choose Video File', content=content, size_hint=(0.9, 0.9))
-        
-        def on_select(instance):
-            if file_chooser.selection:
-                self.handle_file_selection(file_chooser.selection)
-            popup.dismiss()
-        
-        select_btn.bind(on_release=on_select)
-        cancel_btn.bind(on_release=popup.dismiss)
-        
-        popup.open()
+        if self._file_chooser_popup is None:
+            self._file_chooser_popup = FileChooserPopup(self)
+        self._file_chooser_popup.show()
     
     def handle_file_selection(self, selection):
         """Handle selected file"""
@@ -267,334 +1117,75 @@ class MyVideosScreen(Screen):
         
         file_path = selection[0] if isinstance(selection, list) else selection
         
+        if not file_path.lower().endswith(_VIDEO_EXTS):
+            log.warning("Not a supported video file: %s", file_path)
+            return
+        
         # Show dialog to get video name and description
         self.show_video_info_dialog(file_path)
     
     def show_video_info_dialog(self, file_path):
         """Show dialog to enter video information"""
-        content = BoxLayout(orientation='vertical', padding=10, spacing=10)
-        
-        file_name = os.path.basename(file_path)
-        content.add_widget(Label(text=f'File: {file_name}', size_hint_y=0.2))
-        
-        name_input = TextInput(hint_text='Video Name', text=file_name, multiline=False, size_hint_y=0.2)
-        content.add_widget(name_input)
-        
-        desc_input = TextInput(hint_text='Description (optional)', multiline=True, size_hint_y=0.3)
-        content.add_widget(desc_input)
-        
-        button_box = BoxLayout(size_hint_y=0.2, spacing=10)
-        upload_btn = Button(text='Upload')
-        cancel_btn = Button(text='Cancel')
-        button_box.add_widget(upload_btn)
-        button_box.add_widget(cancel_btn)
-        content.add_widget(button_box)
-        
-        popup = Popup(title='Video Information', content=content, size_hint=(0.8, 0.6))
-        
-        def on_upload(instance):
-            video_name = name_input.text or file_name
-            description = desc_input.text
-            if self.on_upload_video:
-                self.on_upload_video(file_path, video_name, description)
-            popup.dismiss()
-        
-        upload_btn.bind(on_release=on_upload)
-        cancel_btn.bind(on_release=popup.dismiss)
-        
-        popup.open()
+        self._video_info_popup.show(file_path)
     
+    @on_ui
     def add_uploaded_video(self, video_id, video_name, size, is_on_network=False):
         """Add a video to the uploaded videos list"""
-        container = BoxLayout(
-            orientation='vertical',
-            size_hint_y=None,
-            height=120,
-            padding=10,
-            spacing=5
-        )
-    
-        # Video info section
-        info_section = BoxLayout(
-            orientation='horizontal',
-            size_hint_y=0.7,
-            spacing=10
-        )
-    
-        # Video details
-        info_label = Label(
-            text=f"🎬 {video_name}\nSize: {self._format_size(size)}\nID: {video_id[:8]}...",
-            size_hint_x=0.6,
-            halign='left',
-            valign='middle',
-            font_size='14sp'
-        )
-        info_label.bind(size=info_label.setter('text_size'))
-        info_section.add_widget(info_label)
-    
-        # Status indicator
-        status = "🌐 On Network" if is_on_network else "📍 Local Only"
-        status_label = Label(
-            text=status,
-            size_hint_x=0.4,
-            font_size='12sp',
-            color=(0.4, 1, 0.4, 1) if is_on_network else (1, 1, 0.4, 1)
-        )
-        info_section.add_widget(status_label)
-    
-        # Button to open options
-        options_btn = Button(
-            text='⋮ Options',
-            size_hint_y=0.3,
-            on_release=lambda x: self.show_uploaded_video_options(video_id, video_name, size, is_on_network)
-        )
-    
-        container.add_widget(info_section)
-        container.add_widget(options_btn)
-    
-        # Add border styling
-        from kivy.graphics import Color, Line
-        with container.canvas.before:
-            Color(0.3, 0.3, 0.3, 1)
-            Line(rectangle=(container.x, container.y, container.width, container.height), width=1.2)
-    
-        self.ids.uploaded_videos_list.add_widget(container)
+        row = _uploaded_row(video_id, video_name, size, is_on_network)
+        self._video_rows[video_id] = (self._uploaded_list, row)
+        self._uploaded_list.data.append(row)
     
+    @on_ui
     def add_downloaded_video(self, video_id, video_name, size, peer_info):
         """Add a video to the downloaded videos list"""
-        container = BoxLayout(
-            orientation='vertical',
-            size_hint_y=None,
-            height=120,
-            padding=10,
-            spacing=5
-        )
-    
-        # Video info section
-        info_section = BoxLayout(
-            orientation='vertical',
-            size_hint_y=0.7,
-            spacing=5
-        )
-    
-        # Video name
-        name_label = Label(
-            text=f"🎬 {video_name}",
-            size_hint_y=0.4,
-            halign='left',
-            valign='middle',
-            font_size='14sp',
-            bold=True
-        )
-        name_label.bind(size=name_label.setter('text_size'))
-        info_section.add_widget(name_label)
-    
-        # Details
-        details_label = Label(
-            text=f"Size: {self._format_size(size)} | From: {peer_info}",
-            size_hint_y=0.6,
-            halign='left',
-            valign='middle',
-            font_size='12sp'
-        )
-        details_label.bind(size=details_label.setter('text_size'))
-        info_section.add_widget(details_label)
-    
-        # Button to open options
-        options_btn = Button(
-            text='⋮ Options',
-            size_hint_y=0.3,
-            on_release=lambda x: self.show_downloaded_video_options(video_id, video_name)
-        )
-    
-        container.add_widget(info_section)
-        container.add_widget(options_btn)
-    
-        # Add border styling
-        from kivy.graphics import Color, Line
-        with container.canvas.before:
-            Color(0.3, 0.3, 0.3, 1)
-            Line(rectangle=(container.x, container.y, container.width, container.height), width=1.2)
-    
-        self.ids.downloaded_videos_list.add_widget(container)
+        row = _downloaded_row(video_id, video_name, size, peer_info)
+        self._video_rows[video_id] = (self._downloaded_list, row)
+        self._downloaded_list.data.append(row)
     
     def show_uploaded_video_options(self, video_id, video_name, size, is_on_network):
         """Show options popup for uploaded videos"""
-        content = BoxLayout(orientation='vertical', padding=20, spacing=15)
-    
-        content.add_widget(Label(
-            text=f'Options for:\n{video_name}',
-            size_hint_y=0.25,
-            font_size='18sp',
-            bold=True
-        ))
-    
-        # Play button
-        play_btn = Button(text='▶️ Play Video', size_hint_y=0.15)
-        play_btn.bind(on_release=lambda x: self.play_video(video_id, popup))
-        content.add_widget(play_btn)
-    
-        # Edit button
-        edit_btn = Button(text='✏️ Edit Info', size_hint_y=0.15)
-        edit_btn.bind(on_release=lambda x: self.edit_video_info(video_id, video_name, popup))
-        content.add_widget(edit_btn)
-    
-        # Upload to network button (only if not already on network)
-        if not is_on_network:
-            upload_network_btn = Button(text='🌐 Upload to Network', size_hint_y=0.15)
-            upload_network_btn.bind(on_release=lambda x: self.upload_to_network(video_id, popup))
-            content.add_widget(upload_network_btn)
-        else:
-            content.add_widget(Label(text='✅ Already on Network', size_hint_y=0.15, color=(0.4, 1, 0.4, 1)))
-    
-        # Delete button
-        delete_btn = Button(text='🗑️ Delete', size_hint_y=0.15, background_color=(0.8, 0.2, 0.2, 1))
-        delete_btn.bind(on_release=lambda x: self.confirm_delete_video(video_id, video_name, popup))
-        content.add_widget(delete_btn)
-    
-        # Cancel button
-        cancel_btn = Button(text='Cancel', size_hint_y=0.15)
-        content.add_widget(cancel_btn)
-    
-        popup = Popup(title='Video Options', content=content, size_hint=(0.7, 0.8))
-        cancel_btn.bind(on_release=popup.dismiss)
-        popup.open()
+        self._uploaded_options_popup.show(video_id, video_name, is_on_network)
     
     def show_downloaded_video_options(self, video_id, video_name):
         """Show options popup for downloaded videos"""
-        content = BoxLayout(orientation='vertical', padding=20, spacing=15)
-    
-        content.add_widget(Label(
-            text=f'Options for:\n{video_name}',
-            size_hint_y=0.3,
-            font_size='18sp',
-            bold=True
-        ))
-    
-        # Play button
-        play_btn = Button(text='▶️ Play Video', size_hint_y=0.2)
-        play_btn.bind(on_release=lambda x: self.play_video(video_id, popup))
-        content.add_widget(play_btn)
-    
-        # Download to device button
-        download_btn = Button(text='💾 Download to Device', size_hint_y=0.2)
-        download_btn.bind(on_release=lambda x: self.download_to_device(video_id, video_name, popup))
-        content.add_widget(download_btn)
-    
-        # Delete button
-        delete_btn = Button(text='🗑️ Remove from Library', size_hint_y=0.2, background_color=(0.8, 0.2, 0.2, 1))
-        delete_btn.bind(on_release=lambda x: self.confirm_delete_downloaded_video(video_id, video_name, popup))
-        content.add_widget(delete_btn)
-    
-        # Cancel button
-        cancel_btn = Button(text='Cancel', size_hint_y=0.1)
-        content.add_widget(cancel_btn)
-    
-        popup = Popup(title='Video Options', content=content, size_hint=(0.7, 0.7))
-        cancel_btn.bind(on_release=popup.dismiss)
-        popup.open()
+        self._downloaded_options_popup.show(video_id, video_name)
     
     def edit_video_info(self, video_id, current_name, parent_popup):
         """Show dialog to edit video information"""
         parent_popup.dismiss()
-        
-        content = BoxLayout(orientation='vertical', padding=10, spacing=10)
-        
-        content.add_widget(Label(text='Edit Video Information', size_hint_y=0.2, font_size='18sp'))
-        
-        name_input = TextInput(hint_text='Video Name', text=current_name, multiline=False, size_hint_y=0.2)
-        content.add_widget(name_input)
-        
-        desc_input = TextInput(hint_text='Description', multiline=True, size_hint_y=0.3)
-        content.add_widget(desc_input)
-        
-        button_box = BoxLayout(size_hint_y=0.2, spacing=10)
-        save_btn = Button(text='💾 Save')
-        cancel_btn = Button(text='Cancel')
-        button_box.add_widget(save_btn)
-        button_box.add_widget(cancel_btn)
-        content.add_widget(button_box)
-        
-        popup = Popup(title='Edit Video', content=content, size_hint=(0.8, 0.6))
-        
-        def on_save(instance):
-            new_name = name_input.text
-            new_desc = desc_input.text
-            if self.on_edit_video:
-                self.on_edit_video(video_id, new_name, new_desc)
-            popup.dismiss()
-            self.refresh_video_lists()
-        
-        save_btn.bind(on_release=on_save)
-        cancel_btn.bind(on_release=popup.dismiss)
-        popup.open()
+        self._edit_video_popup.show(video_id, current_name)
     
     def upload_to_network(self, video_id, parent_popup):
         """Upload video to network"""
         if self.on_upload_to_network:
             self.on_upload_to_network(video_id)
         parent_popup.dismiss()
-        self.refresh_video_lists()
     
     def confirm_delete_video(self, video_id, video_name, parent_popup):
         """Show confirmation dialog before deleting"""
         parent_popup.dismiss()
-        
-        content = BoxLayout(orientation='vertical', padding=20, spacing=15)
-        
-        content.add_widget(Label(
-            text=f'Are you sure you want to delete:\n\n{video_name}\n\nThis cannot be undone.',
-            size_hint_y=0.6
-        ))
-        
-        button_box = BoxLayout(size_hint_y=0.4, spacing=10)
-        confirm_btn = Button(text='🗑️ Delete', background_color=(0.8, 0.2, 0.2, 1))
-        cancel_btn = Button(text='Cancel')
-        button_box.add_widget(confirm_btn)
-        button_box.add_widget(cancel_btn)
-        content.add_widget(button_box)
-        
-        popup = Popup(title='Confirm Delete', content=content, size_hint=(0.7, 0.5))
-        
-        def on_confirm(instance):
-            if self.on_delete_video:
-                self.on_delete_video(video_id, is_uploaded=True)
-            popup.dismiss()
-            self.refresh_video_lists()
-        
-        confirm_btn.bind(on_release=on_confirm)
-        cancel_btn.bind(on_release=popup.dismiss)
-        popup.open()
+        self._app.show_confirm(
+            'Confirm Delete',
+            f'Are you sure you want to delete:\n\n{video_name}\n\nThis cannot be undone.',
+            '🗑️ Delete',
+            partial(self.delete_video, video_id, True)
+        )
     
     def confirm_delete_downloaded_video(self, video_id, video_name, parent_popup):
         """Show confirmation dialog before deleting downloaded video"""
         parent_popup.dismiss()
-        
-        content = BoxLayout(orientation='vertical', padding=20, spacing=15)
-        
-        content.add_widget(Label(
-            text=f'Remove this video from your library?\n\n{video_name}\n\nYou can download it again later.',
-            size_hint_y=0.6
-        ))
-        
-        button_box = BoxLayout(size_hint_y=0.4, spacing=10)
-        confirm_btn = Button(text='🗑️ Remove', background_color=(0.8, 0.2, 0.2, 1))
-        cancel_btn = Button(text='Cancel')
-        button_box.add_widget(confirm_btn)
-        button_box.add_widget(cancel_btn)
-        content.add_widget(button_box)
-        
-        popup = Popup(title='Confirm Remove', content=content, size_hint=(0.7, 0.5))
-        
-        def on_confirm(instance):
-            if self.on_delete_video:
-                self.on_delete_video(video_id, is_uploaded=False)
-            popup.dismiss()
-            self.refresh_video_lists()
-        
-        confirm_btn.bind(on_release=on_confirm)
-        cancel_btn.bind(on_release=popup.dismiss)
-        popup.open()
+        self._app.show_confirm(
+            'Confirm Remove',
+            f'Remove this video from your library?\n\n{video_name}\n\nYou can download it again later.',
+            '🗑️ Remove',
+            partial(self.delete_video, video_id, False)
+        )
+    
+    def delete_video(self, video_id, is_uploaded):
+        """Delete a video and drop its row"""
+        if self.on_delete_video:
+            self.on_delete_video(video_id, is_uploaded=is_uploaded)
+        self.remove_video(video_id)
     
     def download_to_device(self, video_id, video_name, parent_popup):
         """Download video to device's storage"""
@@ -606,97 +1197,87 @@ class MyVideosScreen(Screen):
         """Play the video using system default player or Kivy video player"""
         parent_popup.dismiss()
     
-        app = App.get_running_app()
+        app = self._app
         if not app.peer or video_id not in app.peer.video_library:
             return
     
         video_info = app.peer.video_library[video_id]
         video_path = video_info['path']
     
-        # Try to open with system default player
-        try:
-            import subprocess
-            import platform
-        
-            system = platform.system()
-            if system == 'Windows':
-                os.startfile(video_path)
-            elif system == 'Darwin':  # macOS
-                subprocess.call(['open', video_path])
-            else:  # Linux and others
-                subprocess.call(['xdg-open', video_path])
-        
-            print(f"Opening video: {video_path}")
-        except Exception as e:
-            print(f"Error opening video: {e}")
-            # Fallback: show path to user
-            self.show_video_path_popup(video_path, video_info['name'])
-
-    def show_video_path_popup(self, video_path, video_name):
-        """Show popup with video path if can't open automatically"""
-        content = BoxLayout(orientation='vertical', padding=20, spacing=15)
-    
-        content.add_widget(Label(
-            text=f'Video Location:\n\n{video_path}',
-            size_hint_y=0.7,
-            halign='center',
-            valign='middle'
-        ))
-    
-        copy_btn = Button(text='📋 Copy Path', size_hint_y=0.15)
-        close_btn = Button(text='Close', size_hint_y=0.15)
-    
-        content.add_widget(copy_btn)
-        content.add_widget(close_btn)
-    
-        popup = Popup(
-            title=f'Cannot Auto-Open: {video_name}',
-            content=content,
-            size_hint=(0.8, 0.5)
-        )
-    
-        def copy_path(instance):
-            try:
-                from kivy.core.clipboard import Clipboard
-                Clipboard.copy(video_path)
-                copy_btn.text = '✅ Copied!'
-            except:
-                pass
-    
-        copy_btn.bind(on_release=copy_path)
-        close_btn.bind(on_release=popup.dismiss)
-        popup.open()
+        # Spawning the player can block, so keep it off the UI thread
+        run_in_background(self._open_video, video_path, video_info['name'])
     
+    def _open_video(self, video_path, video_name):
+        """Open a video with the system default player (worker thread)"""
+        try:
+            system = platform.system()
+            if system == 'Windows':
+                os.startfile(video_path)
+            elif system == 'Darwin':  # macOS
+                subprocess.Popen(['open', video_path],
+                                 stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            else:  # Linux and others
+                subprocess.Popen(['xdg-open', video_path],
+                                 stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        
+            log.info("Opening video: %s", video_path)
+        except Exception as e:
+            log.error("Error opening video: %s", e)
+            # Fallback: show path to user
+            self.show_video_path_popup(video_path, video_name)
+
+    @on_ui
+    def show_video_path_popup(self, video_path, video_name):
+        """Show popup with video path if can't open automatically"""
+        self._video_path_popup.show(video_path, video_name)
+    
+    @on_ui
+    def set_videos(self, uploaded_rows, downloaded_rows):
+        """Replace both video lists with prebuilt row data"""
+        video_rows = {}
+        for row in uploaded_rows:
+            video_rows[row['video_id']] = (self._uploaded_list, row)
+        for row in downloaded_rows:
+            video_rows[row['video_id']] = (self._downloaded_list, row)
+        self._video_rows = video_rows
+        self._uploaded_list.data = uploaded_rows
+        self._downloaded_list.data = downloaded_rows
+    
+    @on_ui
+    def update_video(self, video_id, **changes):
+        """Patch the fields of one video row in place"""
+        entry = self._video_rows.get(video_id)
+        if entry:
+            rv, row = entry
+            row.update(changes)
+            rv.refresh_from_data()
+    
+    @on_ui
+    def remove_video(self, video_id):
+        """Remove one video row from whichever list holds it"""
+        entry = self._video_rows.pop(video_id, None)
+        if entry:
+            rv, row = entry
+            rv.data.remove(row)
+    
+    @on_ui
     def clear_videos(self):
         """Clear all videos from both lists"""
-        self.ids.uploaded_videos_list.clear_widgets()
-        self.ids.downloaded_videos_list.clear_widgets()
+        self._video_rows = {}
+        self._uploaded_list.data = []
+        self._downloaded_list.data = []
     
     def refresh_video_lists(self):
         """Refresh the video lists"""
-        app = App.get_running_app()
-        if hasattr(app, '_load_existing_videos'):
-            self.clear_videos()
-            app._load_existing_videos()
+        self._app._load_existing_videos()
     
     def show_settings(self):
         """Show settings popup"""
-        settings = SettingsPopup()
-        settings.open()
-    
-    def _format_size(self, size_bytes):
-        """Format file size"""
-        for unit in ['B', 'KB', 'MB', 'GB']:
-            if size_bytes < 1024.0:
-                return f"{size_bytes:.1f} {unit}"
-            size_bytes /= 1024.0
-        return f"{size_bytes:.1f} TB"
+        self._app.show_settings()
     
     def show_user_menu(self):
         """Show user menu popup"""
-        app = App.get_running_app()
-        if hasattr(app, 'show_user_menu'):
-            app.show_user_menu()
+        self._app.show_user_menu()
 
 
 class NetworkBrowseScreen(Screen):
@@ -706,60 +1287,41 @@ class NetworkBrowseScreen(Screen):
         super().__init__(**kwargs)
         self.on_browse_network: Optional[Callable] = None
         self.on_download_video: Optional[Callable] = None
+        
+        # Coalesce repeated refresh presses into one browse
+        self._refresh_trigger = Clock.create_trigger(self._do_refresh, 0.25)
+    
+    def on_kv_post(self, base_widget):
+        """Cache the app and widget references used by the handlers"""
+        self._app = App.get_running_app()
+        self._network_list = self.ids.network_videos_list
     
     def refresh_network(self):
         """Handle refresh network button"""
+        self._refresh_trigger()
+    
+    def _do_refresh(self, dt):
+        """Run the coalesced network refresh"""
         if self.on_browse_network:
             self.on_browse_network()
     
-    def add_network_video(self, video_id, video_name, size, peer_host, peer_port):
-        """Add a network video to the list"""
-        container = BoxLayout(size_hint_y=None, height=80, spacing=10)
-        
-        info_label = Label(
-            text=f"☁️ {video_name}\nSize: {self._format_size(size)}\nFrom: {peer_host}:{peer_port}",
-            halign='left',
-            valign='middle'
-        )
-        info_label.bind(size=info_label.setter('text_size'))
-        
-        download_btn = Button(
-            text="⬇️ Download",
-            size_hint_x=0.3,
-            on_release=lambda x: self.download_video(video_id, peer_host, peer_port)
-        )
-        
-        container.add_widget(info_label)
-        container.add_widget(download_btn)
-        self.ids.network_videos_list.add_widget(container)
+    @on_ui
+    def set_network_videos(self, rows):
+        """Replace the network list with prebuilt row data"""
+        self._network_list.data = rows
     
-    def download_video(self, video_id, peer_host, peer_port):
+    def download_video(self, video_id, peer_host, peer_port, *args):
         """Handle download video"""
         if self.on_download_video:
             self.on_download_video(video_id, peer_host, peer_port)
     
-    def clear_network_videos(self):
-        """Clear all network videos"""
-        self.ids.network_videos_list.clear_widgets()
-    
     def show_settings(self):
         """Show settings popup"""
-        settings = SettingsPopup()
-        settings.open()
-    
-    def _format_size(self, size_bytes):
-        """Format file size"""
-        for unit in ['B', 'KB', 'MB', 'GB']:
-            if size_bytes < 1024.0:
-                return f"{size_bytes:.1f} {unit}"
-            size_bytes /= 1024.0
-        return f"{size_bytes:.1f} TB"
+        self._app.show_settings()
     
     def show_user_menu(self):
         """Show user menu popup"""
-        app = App.get_running_app()
-        if hasattr(app, 'show_user_menu'):
-            app.show_user_menu()
+        self._app.show_user_menu()
 
 
 class PeersScreen(Screen):
@@ -771,180 +1333,102 @@ class PeersScreen(Screen):
         self.on_add_friend: Optional[Callable] = None
         self.on_remove_friend: Optional[Callable] = None
         self.on_connect_to_peer: Optional[Callable] = None
+        
+        # Coalesce repeated refresh presses into one tracker query
+        self._refresh_trigger = Clock.create_trigger(self._do_refresh, 0.25)
+        
+        self._user_options_popup = UserOptionsPopup(self)
+        
+        # Last values shown, so unchanged updates skip re-rendering the labels
+        self._last_peer_info = None
+        self._last_manual_connection = None
+    
+    def on_kv_post(self, base_widget):
+        """Cache the app and widget references used by the handlers"""
+        self._app = App.get_running_app()
+        self._connected_list = self.ids.connected_users_list
+        self._friends_list = self.ids.friends_list
+        self._my_peer_info = self.ids.my_peer_info
+        self._manual_box = self.ids.manual_connection_box
+        self._manual_label = self.ids.manual_connection_label
     
     def refresh_connected_users(self):
         """Refresh the list of connected users"""
+        self._refresh_trigger()
+    
+    def _do_refresh(self, dt):
+        """Run the coalesced connected users refresh"""
         if self.on_refresh_peers:
             self.on_refresh_peers()
     
-    def add_connected_user(self, peer_id, host, port):
-        """Add a connected user to the list"""
-        container = BoxLayout(
-            orientation='vertical',
-            size_hint_y=None,
-            height=90,
-            padding=8,
-            spacing=5
-        )
-    
-        info_label = Label(
-            text=f"👤 {peer_id}\n📍 {host}:{port}",
-            size_hint_y=0.65,
-            halign='left',
-            valign='middle',
-            font_size='15sp'
-        )
-        info_label.bind(size=info_label.setter('text_size'))
-    
-        options_btn = Button(
-            text='⋮ Options',
-            size_hint_y=0.35,
-            on_release=lambda x: self.show_user_options(peer_id, host, port, is_friend=False)
-        )
-    
-        container.add_widget(info_label)
-        container.add_widget(options_btn)
-    
-        from kivy.graphics import Color, Line
-        with container.canvas.before:
-            Color(0.3, 0.3, 0.3, 1)
-            Line(rectangle=(container.x, container.y, container.width, container.height), width=1.2)
-    
-        self.ids.connected_users_list.add_widget(container)
-    
-    def add_friend(self, peer_id, host, port):
-        """Add a friend to the friends list"""
-        container = BoxLayout(
-            orientation='vertical',
-            size_hint_y=None,
-            height=90,
-            padding=8,
-            spacing=5
-        )
-    
-        # Friend info with better formatting
-        info_label = Label(
-            text=f"⭐ {peer_id}\n📍 {host}:{port}",
-            halign='left',
-            valign='middle',
-            font_size='15sp',
-            color=(1, 0.9, 0.3, 1)
-        )
-        info_label.bind(size=info_label.setter('text_size'))
-    
-        # Options button
-        options_btn = Button(
-            text='⋮ Options',
-            size_hint_y=0.35,
-            on_release=lambda x: self.show_user_options(peer_id, host, port, is_friend=True)
-        )
-    
-        container.add_widget(info_label)
-        container.add_widget(options_btn)
+    @on_ui
+    def set_connected_users(self, rows):
+        """Replace the connected users list with prebuilt row data"""
+        self._connected_list.data = rows
     
-        # Add border
-        from kivy.graphics import Color, Line
-        with container.canvas.before:
-            Color(0.3, 0.3, 0.3, 1)
-            Line(rectangle=(container.x, container.y, container.width, container.height), width=1.2)
-    
-        self.ids.friends_list.add_widget(container)
+    @on_ui
+    def set_friends(self, rows):
+        """Replace the friends list with prebuilt row data"""
+        self._friends_list.data = rows
     
-    def show_user_options(self, peer_id, host, port, is_friend=False):
+    def show_user_options(self, peer_id, host, port, is_friend=False, *args):
         """Show options for a user"""
-        content = BoxLayout(orientation='vertical', padding=20, spacing=15)
-        
-        content.add_widget(Label(
-            text=f'Options for:\n{peer_id}',
-            size_hint_y=0.3,
-            font_size='18sp',
-            bold=True
-        ))
-        
-        # Connect manually button
-        connect_btn = Button(text='🔗 Connect Manually', size_hint_y=0.2)
-        connect_btn.bind(on_release=lambda x: self.connect_to_user(peer_id, host, port, popup))
-        content.add_widget(connect_btn)
-        
-        if is_friend:
-            # Remove from friends
-            remove_btn = Button(
-                text='❌ Remove from Friends',
-                size_hint_y=0.2,
-                background_color=(0.8, 0.2, 0.2, 1)
-            )
-            remove_btn.bind(on_release=lambda x: self.remove_from_friends(peer_id, popup))
-            content.add_widget(remove_btn)
-        else:
-            # Add to friends
-            add_friend_btn = Button(text='⭐ Add to Friends', size_hint_y=0.2)
-            add_friend_btn.bind(on_release=lambda x: self.add_to_friends(peer_id, host, port, popup))
-            content.add_widget(add_friend_btn)
-        
-        # Cancel button
-        cancel_btn = Button(text='Cancel', size_hint_y=0.3)
-        content.add_widget(cancel_btn)
-        
-        popup = Popup(title='User Options', content=content, size_hint=(0.7, 0.6))
-        cancel_btn.bind(on_release=popup.dismiss)
-        popup.open()
+        self._user_options_popup.show(peer_id, host, port, is_friend)
     
-    def connect_to_user(self, peer_id, host, port, parent_popup):
+    def connect_to_user(self, peer_id, host, port, parent_popup, *args):
         """Connect to a user manually"""
         parent_popup.dismiss()
         if self.on_connect_to_peer:
             self.on_connect_to_peer(host, port)
     
-    def add_to_friends(self, peer_id, host, port, parent_popup):
+    def add_to_friends(self, peer_id, host, port, parent_popup, *args):
         """Add user to friends list"""
         parent_popup.dismiss()
         if self.on_add_friend:
             self.on_add_friend(peer_id, host, port)
     
-    def remove_from_friends(self, peer_id, parent_popup):
+    def remove_from_friends(self, peer_id, parent_popup, *args):
         """Remove user from friends list"""
         parent_popup.dismiss()
         if self.on_remove_friend:
             self.on_remove_friend(peer_id)
     
-    def clear_connected_users(self):
-        """Clear connected users list"""
-        self.ids.connected_users_list.clear_widgets()
-    
-    def clear_friends(self):
-        """Clear friends list"""
-        self.ids.friends_list.clear_widgets()
-    
     def set_my_peer_info(self, peer_id, host, port):
         """Set current user's peer information"""
-        self.ids.my_peer_info.text = f"📍 Your Info:\n\nPeer ID: {peer_id}\nHost: {host}\nPort: {port}"
+        if (peer_id, host, port) == self._last_peer_info:
+            return
+        self._last_peer_info = (peer_id, host, port)
+        self._my_peer_info.text = f"📍 Your Info:\n\nPeer ID: {peer_id}\nHost: {host}\nPort: {port}"
     
     def show_settings(self):
         """Show settings popup"""
-        settings = SettingsPopup()
-        settings.open()
+        self._app.show_settings()
     
     def show_user_menu(self):
         """Show user menu popup"""
-        app = App.get_running_app()
-        if hasattr(app, 'show_user_menu'):
-            app.show_user_menu()
+        self._app.show_user_menu()
 
+    @on_ui
     def show_manual_connection(self, peer_id, host, port):
         """Show manual connection indicator"""
-        self.ids.manual_connection_box.height = 60
-        self.ids.manual_connection_label.text = f"🔗 Currently Connected to:\n👤 {peer_id} ({host}:{port})"
+        if (peer_id, host, port) == self._last_manual_connection:
+            return
+        self._last_manual_connection = (peer_id, host, port)
+        self._manual_box.height = 60
+        self._manual_label.text = f"🔗 Currently Connected to:\n👤 {peer_id} ({host}:{port})"
 
+    @on_ui
     def hide_manual_connection(self):
         """Hide manual connection indicator"""
-        self.ids.manual_connection_box.height = 0
-        self.ids.manual_connection_label.text = ""
+        if self._manual_box.height == 0:
+            return
+        self._last_manual_connection = None
+        self._manual_box.height = 0
+        self._manual_label.text = ""
 
     def disconnect_manual(self):
         """Disconnect from manual connection"""
-        app = App.get_running_app()
-        if hasattr(app, 'disconnect_from_peer'):
-            app.disconnect_from_peer()
+        self._app.disconnect_from_peer()
 
 
 class P2PVideoStreamApp(App):
@@ -961,11 +1445,24 @@ class P2PVideoStreamApp(App):
         self.peer_id = None
         self.peer_host = None
         self.peer_port = None
-        self.uploaded_videos = set()  # Videos user uploaded
-        self.downloaded_videos = {}  # Videos downloaded from network: {video_id: peer_info}
-        self.network_videos = set()  # Videos announced to tracker
+        self.videos = {}  # {video_id: VideoState}
         # Track manual connection
         self.manual_connection = None
+        # Held while a browse/refresh worker runs so requests don't overlap
+        self._browse_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._reregister_lock = threading.Lock()
+        # Last tracker peer list as {(host, port): peer_id}, with fetch time
+        self._peers_by_address = {}
+        self._peers_fetched_at = 0.0
+        # Weak references to the widgets recolored on theme change
+        self._themed_widgets = {'label': [], 'button': [], 'textinput': []}
+        # Bursts of theme requests collapse into one run
+        self._theme_trigger = Clock.create_trigger(self._apply_theme_colors, 0.03)
+        self._heartbeat_trigger = Clock.create_trigger(
+            self._send_heartbeat, _HEARTBEAT_INTERVAL, interval=True
+        )
     
     def build(self):
         """Build the application"""
@@ -978,20 +1475,49 @@ class P2PVideoStreamApp(App):
         # Create screen manager
         sm = ScreenManager()
         
-        # Add screens
+        # Only the config screen is needed before a peer is running; the
+        # rest are built by _build_peer_screens once one starts
         self.config_screen = PeerConfigScreen(name='config')
+        sm.add_widget(self.config_screen)
+        self.register_themed(self.config_screen)
+        self.my_videos_screen = None
+        self.network_screen = None
+        self.peers_screen = None
+        
+        # Set callbacks
+        self.config_screen.on_start_peer = self.start_peer
+        self.config_screen.on_load_profile = self.load_profile
+        
+        # Settings popup is shared by all screens
+        self._settings_popup = SettingsPopup()
+        
+        # Confirmation popup is shared too; each caller supplies its action
+        self._confirm_popup = ConfirmPopup()
+        
+        # User menu dialogs are built once and reused
+        self._user_menu_popup = UserMenuPopup(self)
+        self._edit_user_popup = EditUserPopup(self)
+        self._restart_popup = RestartRequiredPopup()
+
+        # Initialize theme colors
+        Clock.schedule_once(self._apply_theme_colors, 0.1)
+        
+        return sm
+    
+    def _build_peer_screens(self):
+        """Create the screens used once a peer is running (first call only)"""
+        if self.my_videos_screen is not None:
+            return
+        
         self.my_videos_screen = MyVideosScreen(name='my_videos')
         self.network_screen = NetworkBrowseScreen(name='network')
         self.peers_screen = PeersScreen(name='peers')
         
-        sm.add_widget(self.config_screen)
-        sm.add_widget(self.my_videos_screen)
-        sm.add_widget(self.network_screen)
-        sm.add_widget(self.peers_screen)
+        for screen in (self.my_videos_screen, self.network_screen, self.peers_screen):
+            self.root.add_widget(screen)
+            self.register_themed(screen)
         
         # Set callbacks
-        self.config_screen.on_start_peer = self.start_peer
-        self.config_screen.on_load_profile = self.load_profile
         self.my_videos_screen.on_upload_video = self.upload_video
         self.my_videos_screen.on_delete_video = self.delete_video
         self.my_videos_screen.on_edit_video = self.edit_video
@@ -1003,17 +1529,17 @@ class P2PVideoStreamApp(App):
         self.peers_screen.on_add_friend = self.add_friend
         self.peers_screen.on_remove_friend = self.remove_friend
         self.peers_screen.on_connect_to_peer = self.connect_to_peer
-
-        # Initialize theme colors
-        from kivy.clock import Clock
-        Clock.schedule_once(lambda dt: self.update_theme_colors(), 0.1)
         
-        return sm
+        # Bring the new widgets in line with the current theme
+        self.update_theme_colors()
+    
+    def on_stop(self):
+        """Let the I/O pool wind down without blocking the close"""
+        # Drop queued work such as pending browses; running transfers finish
+        cancel_background_tasks()
     
     def load_profile(self, peer_id, port, tracker_host, tracker_port):
         """Load an existing profile and start peer"""
-        from Server import load_profile
-    
         profile = load_profile(peer_id)
         if profile:
             # Load friends
@@ -1022,164 +1548,71 @@ class P2PVideoStreamApp(App):
             # Start peer with profile data
             self.start_peer(peer_id, port, tracker_host, tracker_port, friends=friends)
 
-    def show_user_menu(self):
-        """Show user menu popup"""
-        content = BoxLayout(orientation='vertical', padding=20, spacing=15)
-    
-        if self.peer_id:
-            content.add_widget(Label(
-                text=f'User: {self.peer_id}',
-                size_hint_y=0.3,
-                font_size='18sp',
-                bold=True
-            ))
-    
-        # Edit details button
-        edit_btn = Button(text='✏️ Edit User Details', size_hint_y=0.25)
-        edit_btn.bind(on_release=lambda x: self.show_edit_user_dialog(popup))
-        content.add_widget(edit_btn)
-    
-        # Delete user button
-        delete_btn = Button(
-            text='🗑️ Delete User',
-            size_hint_y=0.25,
-            background_color=(0.8, 0.2, 0.2, 1)
-        )
-        delete_btn.bind(on_release=lambda x: self.confirm_delete_user(popup))
-        content.add_widget(delete_btn)
+    def show_settings(self):
+        """Show the shared settings popup"""
+        self._settings_popup.update_display()
+        self._settings_popup.open()
     
-        # Cancel button
-        cancel_btn = Button(text='Cancel', size_hint_y=0.2)
-        content.add_widget(cancel_btn)
+    def show_confirm(self, title, body, action_text, on_confirm):
+        """Show the shared confirmation popup"""
+        self._confirm_popup.show(title, body, action_text, on_confirm)
     
-        popup = Popup(title='User Menu', content=content, size_hint=(0.7, 0.6))
-        cancel_btn.bind(on_release=popup.dismiss)
-        popup.open()
+    def show_user_menu(self):
+        """Show user menu popup"""
+        self._user_menu_popup.show(self.peer_id)
 
-    def show_edit_user_dialog(self, parent_popup):
+    def show_edit_user_dialog(self, parent_popup, *args):
         """Show dialog to edit user details"""
         parent_popup.dismiss()
-    
-        content = BoxLayout(orientation='vertical', padding=10, spacing=10)
-    
-        content.add_widget(Label(text='Edit User Details', size_hint_y=0.15, font_size='18sp'))
-    
-        peer_id_input = TextInput(
-            hint_text='Peer ID',
-            text=self.peer_id or '',
-            multiline=False,
-            size_hint_y=0.15
-        )
-        content.add_widget(peer_id_input)
-    
-        port_input = TextInput(
-            hint_text='Port',
-            text=str(self.peer_port) if self.peer_port else '5000',
-            multiline=False,
-            size_hint_y=0.15
-        )
-        content.add_widget(port_input)
-    
-        tracker_host_input = TextInput(
-            hint_text='Tracker Host',
-            text=self.tracker_host or 'localhost',
-            multiline=False,
-            size_hint_y=0.15
-        )
-        content.add_widget(tracker_host_input)
-    
-        tracker_port_input = TextInput(
-            hint_text='Tracker Port',
-            text=str(self.tracker_port) if self.tracker_port else '6000',
-            multiline=False,
-            size_hint_y=0.15
+        self._edit_user_popup.show(
+            self.peer_id, self.peer_port, self.tracker_host, self.tracker_port
         )
-        content.add_widget(tracker_port_input)
-    
-        button_box = BoxLayout(size_hint_y=0.15, spacing=10)
-        save_btn = Button(text='💾 Save')
-        cancel_btn = Button(text='Cancel')
-        button_box.add_widget(save_btn)
-        button_box.add_widget(cancel_btn)
-        content.add_widget(button_box)
-    
-        popup = Popup(title='Edit User', content=content, size_hint=(0.8, 0.7))
-    
-        def on_save(instance):
-            # Note: Editing requires restart
-            new_peer_id = peer_id_input.text
-            new_port = int(port_input.text)
-            new_tracker_host = tracker_host_input.text
-            new_tracker_port = int(tracker_port_input.text)
-        
-            # Save profile
-            from Server import save_profile, get_friends
-            friends = get_friends(self.peer_id) if self.peer_id else []
-            save_profile(new_peer_id, new_port, new_tracker_host, new_tracker_port, friends)
-        
-            popup.dismiss()
-            self.show_restart_message()
+
+    def save_user_details(self, peer_id, port, tracker_host, tracker_port):
+        """Save edited user details; they take effect after a restart"""
+        friends = get_friends(self.peer_id) if self.peer_id else []
+        if not save_profile(peer_id, port, tracker_host, tracker_port, friends):
+            log.error("Could not save profile for %s", peer_id)
+            return
     
-        save_btn.bind(on_release=on_save)
-        cancel_btn.bind(on_release=popup.dismiss)
-        popup.open()
+        self.show_restart_message()
 
     def show_restart_message(self):
         """Show message that restart is required"""
-        content = BoxLayout(orientation='vertical', padding=20, spacing=15)
-    
-        content.add_widget(Label(
-            text='Changes saved!\n\nPlease restart the application\nfor changes to take effect.',
-            size_hint_y=0.7
-        ))
-    
-        ok_btn = Button(text='OK', size_hint_y=0.3)
-        content.add_widget(ok_btn)
-    
-        popup = Popup(title='Restart Required', content=content, size_hint=(0.6, 0.4))
-        ok_btn.bind(on_release=popup.dismiss)
-        popup.open()
+        self._restart_popup.open()
 
-    def confirm_delete_user(self, parent_popup):
+    def confirm_delete_user(self, parent_popup, *args):
         """Confirm user deletion"""
         parent_popup.dismiss()
+        self.show_confirm(
+            'Confirm Delete',
+            f'Delete user "{self.peer_id}"?\n\nThis will delete:\n- All uploaded videos\n- All settings\n- Friend list\n\nThis cannot be undone!',
+            '🗑️ Delete',
+            self.delete_user
+        )
     
-        content = BoxLayout(orientation='vertical', padding=20, spacing=15)
-    
-        content.add_widget(Label(
-            text=f'Delete user "{self.peer_id}"?\n\nThis will delete:\n- All uploaded videos\n- All settings\n- Friend list\n\nThis cannot be undone!',
-            size_hint_y=0.7
-        ))
-    
-        button_box = BoxLayout(size_hint_y=0.3, spacing=10)
-        confirm_btn = Button(text='🗑️ Delete', background_color=(0.8, 0.2, 0.2, 1))
-        cancel_btn = Button(text='Cancel')
-        button_box.add_widget(confirm_btn)
-        button_box.add_widget(cancel_btn)
-        content.add_widget(button_box)
-    
-        popup = Popup(title='Confirm Delete', content=content, size_hint=(0.7, 0.6))
-    
-        def on_confirm(instance):
-            from Server import delete_profile
-            delete_profile(self.peer_id)
-            popup.dismiss()
-        
-            # Stop peer and return to config screen
-            if self.peer:
-                self.peer.stop()
-            self.root.current = 'config'
-            self.config_screen.load_profiles()
+    def delete_user(self):
+        """Delete the current user's profile and return to config screen"""
+        delete_profile(self.peer_id)
     
-        confirm_btn.bind(on_release=on_confirm)
-        cancel_btn.bind(on_release=popup.dismiss)
-        popup.open()
+        # Stop peer and return to config screen
+        self._heartbeat_trigger.cancel()
+        if self.peer:
+            self.peer.stop()
+        self.root.current = 'config'
+        self.config_screen.load_profiles()
     
     def start_peer(self, peer_id, port, tracker_host, tracker_port, friends=None):
         """Start the peer node"""
+        # Binding and the tracker round trip block, so keep them off the UI
+        # thread; a second tap while a start is in flight is ignored
+        if not self._start_lock.acquire(blocking=False):
+            return
+        run_in_background(self._start_peer, peer_id, port, tracker_host, tracker_port, friends)
+    
+    def _start_peer(self, peer_id, port, tracker_host, tracker_port, friends):
+        """Start the peer and register it with the tracker (I/O pool)"""
         try:
-            from Server import Peer, register_with_tracker, save_profile
-        
             self.tracker_host = tracker_host
             self.tracker_port = tracker_port
             self.peer_id = peer_id
@@ -1187,7 +1620,10 @@ class P2PVideoStreamApp(App):
             self.peer_port = port
         
             # Save profile
-            save_profile(peer_id, port, tracker_host, tracker_port, friends or [])
+            if not save_profile(peer_id, port, tracker_host, tracker_port, friends or []):
+                self.config_screen.show_message(
+                    "Could not save profile; starting anyway", error=True
+                )
         
             # Create and start peer
             self.peer = Peer(peer_id=peer_id, host='localhost', port=port)
@@ -1203,31 +1639,80 @@ class P2PVideoStreamApp(App):
                 )
             
                 if success:
-                    Clock.schedule_once(lambda dt: self.config_screen.set_peer_started(), 0)
-                    Clock.schedule_once(lambda dt: self._load_existing_videos(), 0.1)
-                    Clock.schedule_once(lambda dt: self.refresh_peers(), 1.0)
-                    Clock.schedule_once(lambda dt: self._set_my_peer_info(), 0.3)
-                    Clock.schedule_once(lambda dt: self._load_friends(), 0.4)
+                    self._on_peer_started()
                 else:
-                    Clock.schedule_once(
-                        lambda dt: self.config_screen.show_message(
-                            "Failed to register with tracker", error=True
-                        ), 0
+                    self.config_screen.show_message(
+                        "Failed to register with tracker", error=True
                     )
             else:
-                Clock.schedule_once(
-                    lambda dt: self.config_screen.show_message(
-                        "Failed to start peer", error=True
-                    ), 0
+                self.config_screen.show_message(
+                    "Failed to start peer", error=True
                 )
         except Exception as e:
-            Clock.schedule_once(
-                lambda dt: self.config_screen.show_message(
-                    f"Error: {str(e)}", error=True
-                ), 0
+            self.config_screen.show_message(
+                f"Error: {str(e)}", error=True
+            )
+        finally:
+            self._start_lock.release()
+
+    @on_ui
+    def _on_peer_started(self):
+        """Fill the peer screens as soon as the peer is registered"""
+        self._build_peer_screens()
+        self.config_screen.set_peer_started()
+        self._load_existing_videos()
+        self._set_my_peer_info()
+        # The tracker already has us, so the peer list can be fetched now
+        self.refresh_peers()
+        run_in_background(self._load_friends)
+        self._heartbeat_trigger()
+
+    def _send_heartbeat(self, dt):
+        """Keep this peer registered; queued, so the UI never waits on it"""
+        if self.peer:
+            future = post_heartbeat(self.peer_id, self.tracker_host, self.tracker_port)
+            future.add_done_callback(self._on_heartbeat_response)
+
+    def _on_heartbeat_response(self, future):
+        """Register again if the tracker no longer knows this peer (sender thread)"""
+        response = future.result()
+        if response is None:
+            # The request failed on the connection; the next heartbeat retries
+            log.warning("Heartbeat to tracker %s:%s failed", self.tracker_host, self.tracker_port)
+        elif response.get('status') != 'success':
+            # Dropped by the tracker (timed out, or it restarted without
+            # its state): every later heartbeat would fail the same way
+            log.warning("Tracker dropped this peer (%s); registering again",
+                        response.get('message'))
+            run_in_background(self._reregister)
+
+    def _reregister(self):
+        """Register with the tracker again and re-announce our videos (I/O pool)"""
+        if not self.peer or not self._reregister_lock.acquire(blocking=False):
+            return
+        try:
+            success = register_with_tracker(
+                peer_id=self.peer_id,
+                peer_host=self.peer_host,
+                peer_port=self.peer_port,
+                tracker_host=self.tracker_host,
+                tracker_port=self.tracker_port
             )
+            if not success:
+                log.error("Failed to register with tracker again")
+                return
+            
+            for video_id, state in list(self.videos.items()):
+                if state.on_network:
+                    self._announce_video(video_id)
+        finally:
+            self._reregister_lock.release()
 
     def update_theme_colors(self):
+        """Schedule a theme color update (coalesced)"""
+        self._theme_trigger()
+
+    def _apply_theme_colors(self, dt):
         """Update text colors based on current theme"""
         # Define colors based on theme
         if self.theme_mode == 'light':
@@ -1239,32 +1724,36 @@ class P2PVideoStreamApp(App):
             button_color = (1, 1, 1, 1)  # White for buttons
             hint_color = (0.7, 0.7, 0.7, 1)  # Light gray for hints
     
-        # Update all screens
-        for screen_name in ['config', 'my_videos', 'network', 'peers']:
-            screen = self.root.get_screen(screen_name)
-            self._update_widget_colors(screen, text_color, button_color, hint_color)
-
-    def _update_widget_colors(self, widget, text_color, button_color, hint_color):
-        """Recursively update colors for all widgets"""
-        from kivy.uix.label import Label
-        from kivy.uix.button import Button
-        from kivy.uix.textinput import TextInput
-    
-        # Update current widget if it's a text widget
-        if isinstance(widget, Label):
-            # Don't change color if it's a status label with specific colors
-            if not hasattr(widget, 'id') or widget.id != 'status_label':
-                widget.color = text_color
-        elif isinstance(widget, Button):
-            widget.color = button_color
-        elif isinstance(widget, TextInput):
-            widget.foreground_color = text_color
-            widget.hint_text_color = hint_color
-    
-        # Recursively update children
-        if hasattr(widget, 'children'):
-            for child in widget.children:
-                self._update_widget_colors(child, text_color, button_color, hint_color)
+        themed = self._themed_widgets
+        themed['label'] = self._recolor(themed['label'], 'color', text_color)
+        themed['button'] = self._recolor(themed['button'], 'color', button_color)
+        themed['textinput'] = self._recolor(themed['textinput'], 'foreground_color', text_color)
+        themed['textinput'] = self._recolor(themed['textinput'], 'hint_text_color', hint_color)
+
+    def register_themed(self, root):
+        """Record root and its text widgets so theme changes can recolor them"""
+        themed = self._themed_widgets
+        # The status label keeps its own success/error colors
+        status_label = self.config_screen.ids.get('status_label')
+        for widget in root.walk(restrict=True):
+            if isinstance(widget, Button):
+                themed['button'].append(ref(widget))
+            elif isinstance(widget, Label):
+                if widget is not status_label:
+                    themed['label'].append(ref(widget))
+            elif isinstance(widget, TextInput):
+                themed['textinput'].append(ref(widget))
+
+    @staticmethod
+    def _recolor(refs, attr, color):
+        """Set attr on every live widget; returns the refs still alive"""
+        alive = []
+        for widget_ref in refs:
+            widget = widget_ref()
+            if widget is not None:
+                setattr(widget, attr, color)
+                alive.append(widget_ref)
+        return alive
     
     def upload_video(self, file_path, video_name, description):
         """Handle video upload"""
@@ -1276,17 +1765,15 @@ class P2PVideoStreamApp(App):
         
             if video_id:
                 # Mark as uploaded video
-                self.uploaded_videos.add(video_id)
+                self.videos.setdefault(video_id, VideoState()).uploaded = True
             
                 # Update UI
                 video_info = self.peer.video_library[video_id]
-                Clock.schedule_once(
-                    lambda dt: self.my_videos_screen.add_uploaded_video(
-                        video_id, video_name, video_info['size'], is_on_network=False
-                    ), 0
+                self.my_videos_screen.add_uploaded_video(
+                    video_id, video_name, video_info['size'], is_on_network=False
                 )
     
-        threading.Thread(target=do_upload, daemon=True).start()
+        run_in_background(do_upload)
 
     def delete_video(self, video_id, is_uploaded=True):
         """Delete a video from the library"""
@@ -1296,58 +1783,53 @@ class P2PVideoStreamApp(App):
         def do_delete():
             try:
                 # Remove from peer's library and delete file
-                if video_id in self.peer.video_library:
-                    video_path = self.peer.video_library[video_id]['path']
-                    if os.path.exists(video_path):
-                        os.remove(video_path)
-                    del self.peer.video_library[video_id]
+                video_info = self.peer.remove_video(video_id)
+                if video_info:
+                    try:
+                        os.unlink(video_info['path'])
+                    except FileNotFoundError:
+                        pass
             
-                # Remove from tracking sets
-                if is_uploaded:
-                    self.uploaded_videos.discard(video_id)
-                else:
-                    self.downloaded_videos.pop(video_id, None)
-                self.network_videos.discard(video_id)
+                # Stop tracking it
+                self.videos.pop(video_id, None)
             
-                print(f"Deleted video: {video_id}")
+                log.info("Deleted video: %s", video_id)
             except Exception as e:
-                print(f"Error deleting video: {e}")
+                log.error("Error deleting video: %s", e)
     
-        threading.Thread(target=do_delete, daemon=True).start()
+        run_in_background(do_delete)
 
     def edit_video(self, video_id, new_name, new_description):
         """Edit video information"""
-        if not self.peer or video_id not in self.peer.video_library:
+        if not self.peer or not self.peer.update_video_info(video_id, new_name, new_description):
             return
     
-        with self.peer.lock:
-            self.peer.video_library[video_id]['name'] = new_name
-            self.peer.video_library[video_id]['description'] = new_description
-    
-        print(f"Updated video info for {video_id}")
+        log.info("Updated video info for %s", video_id)
 
     def upload_to_network(self, video_id):
         """Announce video to tracker (upload to network)"""
         if not self.peer:
             return
     
-        def do_announce():
-            from Server import announce_video_to_tracker
-        
-            success = announce_video_to_tracker(
-                peer_id=self.peer.peer_id,
-                video_id=video_id,
-                tracker_host=self.tracker_host,
-                tracker_port=self.tracker_port
-            )
-        
-            if success:
-                self.network_videos.add(video_id)
-                print(f"Video {video_id} announced to network")
-                # Refresh the video list to show updated network status
-                Clock.schedule_once(lambda dt: self.my_videos_screen.refresh_video_lists(), 0.5)
+        run_in_background(self._announce_video, video_id)
+
+    def _announce_video(self, video_id):
+        """Announce a video to the tracker and mark it as on the network"""
+        success = announce_video_to_tracker(
+            peer_id=self.peer.peer_id,
+            video_id=video_id,
+            tracker_host=self.tracker_host,
+            tracker_port=self.tracker_port
+        )
     
-        threading.Thread(target=do_announce, daemon=True).start()
+        if success:
+            state = self.videos.setdefault(video_id, VideoState())
+            state.on_network = True
+            log.info("Video %s announced to network", video_id)
+            # Show the updated network status on its row (uploaded rows only)
+            if state.uploaded or state.source_peer is None:
+                self.my_videos_screen.update_video(video_id, is_on_network=True)
+        return success
 
     def download_to_device(self, video_id, video_name):
         """Download video file to user's device storage"""
@@ -1361,7 +1843,6 @@ class P2PVideoStreamApp(App):
             
                 # Use file chooser to select save location
                 if HAS_PLYER:
-                    from plyer import filechooser
                     save_path = filechooser.save_file(
                         title=f"Save {video_name}",
                         filters=[("Video files", "*.mp4")]
@@ -1372,70 +1853,53 @@ class P2PVideoStreamApp(App):
                             save_path = save_path[0]
                     
                         # Copy file to selected location
-                        import shutil
-                        shutil.copy2(source_path, save_path)
-                        print(f"Video saved to: {save_path}")
+                        _copy_video(source_path, save_path)
+                        log.info("Video saved to: %s", save_path)
                 else:
                     # Fallback: save to Downloads or current directory
-                    import shutil
                     downloads_path = os.path.expanduser("~/Downloads")
                     if not os.path.exists(downloads_path):
                         downloads_path = os.path.expanduser("~")
                 
                     save_path = os.path.join(downloads_path, f"{video_name}.mp4")
-                    shutil.copy2(source_path, save_path)
-                    print(f"Video saved to: {save_path}")
+                    _copy_video(source_path, save_path)
+                    log.info("Video saved to: %s", save_path)
                 
             except Exception as e:
-                print(f"Error saving video: {e}")
+                log.error("Error saving video: %s", e)
     
-        threading.Thread(target=do_save, daemon=True).start()
+        run_in_background(do_save)
     
     def browse_network(self):
         """Browse videos on the network"""
         if not self.peer:
             return
+        if not self._browse_lock.acquire(blocking=False):
+            return
     
         def do_browse():
             try:
-                from Server import get_peers_from_tracker
-            
-                self.network_screen.clear_network_videos()
-            
                 # Get all peers from tracker
                 peers = get_peers_from_tracker(
                     tracker_host=self.tracker_host,
                     tracker_port=self.tracker_port
                 )
             
-                # Query each peer for their videos
-                for peer_info in peers:
-                    peer_id = peer_info['peer_id']
-                    peer_host = peer_info['host']
-                    peer_port = peer_info['port']
-                
-                    # Skip our own peer
-                    if peer_id == self.peer_id:
-                        continue
-                
-                    try:
-                        # Request video list from this peer
-                        videos = self.peer.request_video_list(peer_host, peer_port)
-                    
-                        for video in videos:
-                            Clock.schedule_once(
-                                lambda dt, v=video, h=peer_host, p=peer_port:
-                                self.network_screen.add_network_video(
-                                    v['id'], v['name'], v['size'], h, p
-                                ), 0
-                            )
-                    except Exception as e:
-                        print(f"Error getting videos from {peer_id}: {e}")
+                # Query every other peer for its videos in parallel and build
+                # the rows here so the UI thread only swaps the list data
+                others = [(p['host'], p['port']) for p in peers if p['peer_id'] != self.peer_id]
+                rows = []
+                for (host, port), videos in zip(others, self.peer.request_video_lists(others)):
+                    rows.extend(_network_row(video, host, port) for video in videos)
+            
+                self.network_screen.set_network_videos(rows)
                     
             except Exception as e:
-                print(f"Error browsing network: {e}")
+                log.error("Error browsing network: %s", e)
+            finally:
+                self._browse_lock.release()
     
-        threading.Thread(target=do_browse, daemon=True).start()
+        run_in_background(do_browse)
     
     def download_video(self, video_id, peer_host, peer_port):
         """Download a video from another peer"""
@@ -1443,33 +1907,23 @@ class P2PVideoStreamApp(App):
             return
     
         def do_download():
-            from Server import announce_video_to_tracker
-        
             success = self.peer.download_video(peer_host, peer_port, video_id)
         
             if success:
                 # Mark as downloaded video with source peer info
                 peer_info = f"{peer_host}:{peer_port}"
-                self.downloaded_videos[video_id] = peer_info
-            
-                # Announce to tracker
-                announce_video_to_tracker(
-                    peer_id=self.peer.peer_id,
-                    video_id=video_id,
-                    tracker_host=self.tracker_host,
-                    tracker_port=self.tracker_port
-                )
-                self.network_videos.add(video_id)
+                self.videos.setdefault(video_id, VideoState()).source_peer = peer_info
             
-                # Update UI
+                # Update UI first; the row doesn't depend on the announce
                 video_info = self.peer.video_library[video_id]
-                Clock.schedule_once(
-                    lambda dt: self.my_videos_screen.add_downloaded_video(
-                        video_id, video_info['name'], video_info['size'], peer_info
-                    ), 0
+                self.my_videos_screen.add_downloaded_video(
+                    video_id, video_info['name'], video_info['size'], peer_info
                 )
+            
+                # Announce to tracker
+                self._announce_video(video_id)
     
-        threading.Thread(target=do_download, daemon=True).start()
+        run_in_background(do_download)
     
     def connect_to_peer(self, peer_host, peer_port):
         """Connect to a peer manually"""
@@ -1479,18 +1933,14 @@ class P2PVideoStreamApp(App):
         self.peer.add_known_peer(peer_host, peer_port)
     
         def do_connect():
-            from Server import get_peers_from_tracker
-        
-            peers = get_peers_from_tracker(
-                tracker_host=self.tracker_host,
-                tracker_port=self.tracker_port
-            )
+            # Reuse a recent tracker list rather than asking again
+            if time.monotonic() - self._peers_fetched_at > _PEER_CACHE_TTL:
+                self._cache_peers(get_peers_from_tracker(
+                    tracker_host=self.tracker_host,
+                    tracker_port=self.tracker_port
+                ))
         
-            peer_id = "Unknown"
-            for peer_info in peers:
-                if peer_info['host'] == peer_host and peer_info['port'] == peer_port:
-                    peer_id = peer_info['peer_id']
-                    break
+            peer_id = self._peers_by_address.get((peer_host, peer_port), "Unknown")
         
             self.manual_connection = {
                 'peer_id': peer_id,
@@ -1498,11 +1948,21 @@ class P2PVideoStreamApp(App):
                 'port': peer_port
             }
         
-            Clock.schedule_once(
-                lambda dt: self.peers_screen.show_manual_connection(peer_id, peer_host, peer_port), 0
-            )
+            self.peers_screen.show_manual_connection(peer_id, peer_host, peer_port)
     
-        threading.Thread(target=do_connect, daemon=True).start()
+        run_in_background(do_connect)
+
+    def _cache_peers(self, peers):
+        """
+        Remember a tracker peer list for (host, port) -> peer_id lookups
+
+        Returns:
+            The peers as typed (peer_id, host, port) tuples
+        """
+        peers = [(str(p['peer_id']), str(p['host']), int(p['port'])) for p in peers]
+        self._peers_by_address = {(host, port): peer_id for peer_id, host, port in peers}
+        self._peers_fetched_at = time.monotonic()
+        return peers
 
     def disconnect_from_peer(self):
         """Disconnect from manually connected peer"""
@@ -1515,31 +1975,40 @@ class P2PVideoStreamApp(App):
         if not self.peer:
             return
     
-        for video_id, video_info in self.peer.video_library.items():
+        with self.peer.lock:
+            library = list(self.peer.video_library.items())
+    
+        # Row building scales with the library, so do it off the UI thread
+        run_in_background(self._build_video_rows, library)
+    
+    def _build_video_rows(self, library):
+        """Build the row data for both video lists and hand it to the screen"""
+        # Build all rows first so each list is handed to its view once
+        uploaded_rows = []
+        downloaded_rows = []
+        videos = self.videos
+        for video_id, video_info in library:
+            state = videos.get(video_id)
+            if state is None:
+                # Default to uploaded if not tracked
+                state = videos[video_id] = VideoState(uploaded=True)
+        
             # Check if it's an uploaded or downloaded video
-            if video_id in self.uploaded_videos:
-                # Uploaded video
-                is_on_network = video_id in self.network_videos
-                self.my_videos_screen.add_uploaded_video(
-                    video_id, video_info['name'], video_info['size'], is_on_network
-                )
-            elif video_id in self.downloaded_videos:
-                # Downloaded video
-                peer_info = self.downloaded_videos[video_id]
-                self.my_videos_screen.add_downloaded_video(
-                    video_id, video_info['name'], video_info['size'], peer_info
-                )
+            if state.uploaded or state.source_peer is None:
+                uploaded_rows.append(_uploaded_row(
+                    video_id, video_info['name'], video_info['size'], state.on_network
+                ))
             else:
-                # Default to uploaded if not tracked
-                self.uploaded_videos.add(video_id)
-                self.my_videos_screen.add_uploaded_video(
-                    video_id, video_info['name'], video_info['size'], is_on_network=False
-                )
+                downloaded_rows.append(_downloaded_row(
+                    video_id, video_info['name'], video_info['size'], state.source_peer
+                ))
+    
+        self.my_videos_screen.set_videos(uploaded_rows, downloaded_rows)
     
     def _set_my_peer_info(self):
         """Set current user's peer information in Peers screen"""
         if self.peer:
-            print(f"Setting peer info: ID={self.peer_id}, Host={self.peer_host}, Port={self.peer_port}")
+            log.info("Setting peer info: ID=%s, Host=%s, Port=%s", self.peer_id, self.peer_host, self.peer_port)
             self.peers_screen.set_my_peer_info(
                 self.peer_id, self.peer_host, self.peer_port
             )
@@ -1549,38 +2018,36 @@ class P2PVideoStreamApp(App):
         if not self.peer:
             return
     
-        from Server import get_peers_from_tracker
+        # Refresh presses are already coalesced by the peers screen; this
+        # only keeps a second query from starting while one is in flight
+        if not self._refresh_lock.acquire(blocking=False):
+            return
     
         def do_refresh():
-            peers = get_peers_from_tracker(
-                tracker_host=self.tracker_host,
-                tracker_port=self.tracker_port
-            )
-        
-            Clock.schedule_once(lambda dt: self.peers_screen.clear_connected_users(), 0)
-        
-            if peers:
-                for peer_info in peers:
-                    p_id = str(peer_info['peer_id'])
-                    p_host = str(peer_info['host'])
-                    p_port = int(peer_info['port'])
-                
-                    if p_id != self.peer.peer_id:
+            try:
+                peers = self._cache_peers(get_peers_from_tracker(
+                    tracker_host=self.tracker_host,
+                    tracker_port=self.tracker_port
+                ))
+            
+                my_id = self.peer.peer_id
+                rows = []
+                for p_id, p_host, p_port in peers:
+                    if p_id != my_id:
                         self.peer.add_known_peer(p_host, p_port)
-                    
-                        def add_user(peer_id, peer_host, peer_port):
-                            self.peers_screen.add_connected_user(peer_id, peer_host, peer_port)
-                    
-                        Clock.schedule_once(lambda dt, a=p_id, b=p_host, c=p_port: add_user(a, b, c), 0)
+                        rows.append(_peer_row(p_id, p_host, p_port))
+            
+                self.peers_screen.set_connected_users(rows)
+            finally:
+                self._refresh_lock.release()
     
-        threading.Thread(target=do_refresh, daemon=True).start()
+        run_in_background(do_refresh)
 
     def add_friend(self, peer_id, host, port):
         """Add a peer to friends list"""
         if not self.peer_id:
             return
     
-        from Server import add_friend
         success = add_friend(self.peer_id, peer_id, host, port)
     
         if success:
@@ -1592,7 +2059,6 @@ class P2PVideoStreamApp(App):
         if not self.peer_id:
             return
     
-        from Server import remove_friend
         success = remove_friend(self.peer_id, peer_id)
     
         if success:
@@ -1604,14 +2070,9 @@ class P2PVideoStreamApp(App):
         if not self.peer_id:
             return
     
-        from Server import get_friends
         friends = get_friends(self.peer_id)
     
-        self.peers_screen.clear_friends()
-    
-        for friend in friends:
-            self.peers_screen.add_friend(
-                friend['peer_id'],
-                friend['host'],
-                friend['port']
-            )
+        self.peers_screen.set_friends([
+            _peer_row(friend['peer_id'], friend['host'], friend['port'], is_friend=True)
+            for friend in friends
+        ])
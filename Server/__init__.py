@@ -12,6 +12,7 @@ from .network_utils import (
     find_video_peers,
     find_all_videos_on_tracker,
     send_heartbeat,
+    post_heartbeat,
     format_file_size,
     get_local_ip,
     test_connection
@@ -23,7 +24,8 @@ from .user_profile import (
     delete_profile,
     add_friend,
     remove_friend,
-    get_friends
+    get_friends,
+    flush_profiles
 )
 
 __all__ = [
@@ -36,6 +38,7 @@ __all__ = [
     'find_video_peers',
     'find_all_videos_on_tracker',
     'send_heartbeat',
+    'post_heartbeat',
     'format_file_size',
     'get_local_ip',
     'test_connection',
@@ -45,5 +48,6 @@ __all__ = [
     'delete_profile',
     'add_friend',
     'remove_friend',
-    'get_friends'
+    'get_friends',
+    'flush_profiles'
 ]
\ No newline at end of file
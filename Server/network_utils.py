@@ -3,9 +3,18 @@ Network Utilities for P2P Video Streaming Application
 Helper functions for network communication and peer management
 """
 
+import queue
 import socket
-import json
-from typing import Optional, Tuple
+import threading
+from concurrent.futures import Future
+from typing import Dict, Optional, Tuple
+
+from .wire import send_message, recv_message, open_connection, set_keepalive
+
+
+# Seconds to wait on the tracker connection before a request fails, so a
+# stalled tracker can't freeze its caller
+TRACKER_TIMEOUT = 10.0
 
 
 def send_json_message(sock: socket.socket, data: dict) -> bool:
@@ -20,33 +29,85 @@ def send_json_message(sock: socket.socket, data: dict) -> bool:
         True if successful, False otherwise
     """
     try:
-        message = json.dumps(data).encode('utf-8')
-        sock.send(message)
+        send_message(sock, data)
         return True
     except Exception as e:
         print(f"Error sending JSON message: {e}")
         return False
 
 
-def receive_json_message(sock: socket.socket, buffer_size: int = 4096) -> Optional[dict]:
+def receive_json_message(sock: socket.socket) -> Optional[dict]:
     """
     Receive a JSON message from a socket
     
     Args:
         sock: Socket to receive from
-        buffer_size: Size of receive buffer
         
     Returns:
         Parsed JSON dictionary or None if error
     """
     try:
-        data = sock.recv(buffer_size).decode('utf-8')
-        return json.loads(data)
+        return recv_message(sock)
     except Exception as e:
         print(f"Error receiving JSON message: {e}")
         return None
 
 
+class _TrackerClient:
+    """
+    Persistent connection to one tracker, shared by every request to it.
+    Requests are serialized on the connection; if it has been closed (the
+    tracker drops idle connections) the request is retried once on a new one.
+    """
+    
+    def __init__(self, tracker_host: str, tracker_port: int):
+        self.tracker_host = tracker_host
+        self.tracker_port = tracker_port
+        self.sock: Optional[socket.socket] = None
+        self.lock = threading.Lock()
+    
+    def rpc(self, request: dict) -> dict:
+        """Send one request and return the tracker's response"""
+        with self.lock:
+            for attempt in range(2):
+                if self.sock is None:
+                    self.sock = open_connection(self.tracker_host, self.tracker_port)
+                    self.sock.settimeout(TRACKER_TIMEOUT)
+                    set_keepalive(self.sock)
+                try:
+                    send_message(self.sock, request)
+                    return recv_message(self.sock)
+                except OSError:
+                    self._close()
+                    if attempt:
+                        raise
+                except Exception:
+                    self._close()
+                    raise
+    
+    def _close(self):
+        """Drop the current connection"""
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+        self.sock = None
+
+
+_tracker_clients: Dict[Tuple[str, int], _TrackerClient] = {}
+_tracker_clients_lock = threading.Lock()
+
+
+def _tracker_client(tracker_host: str, tracker_port: int) -> _TrackerClient:
+    """Get the shared client for a tracker address"""
+    key = (tracker_host, tracker_port)
+    client = _tracker_clients.get(key)
+    if client is None:
+        with _tracker_clients_lock:
+            client = _tracker_clients.setdefault(key, _TrackerClient(tracker_host, tracker_port))
+    return client
+
+
 def connect_to_tracker(tracker_host: str, tracker_port: int, 
                        request: dict) -> Optional[dict]:
     """
@@ -61,24 +122,54 @@ def connect_to_tracker(tracker_host: str, tracker_port: int,
         Response dictionary or None if error
     """
     try:
-        # Create socket and connect
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.connect((tracker_host, tracker_port))
-        
-        # Send request
-        send_json_message(sock, request)
-        
-        # Receive response
-        response = receive_json_message(sock)
-        
-        sock.close()
-        return response
+        # Reuses the open connection to this tracker when there is one
+        return _tracker_client(tracker_host, tracker_port).rpc(request)
         
     except Exception as e:
         print(f"Error connecting to tracker: {e}")
         return None
 
 
+# Requests whose caller doesn't wait for the reply (heartbeats) are queued
+# here and sent by a single daemon thread over the shared tracker connection
+_tracker_outbox: queue.SimpleQueue = queue.SimpleQueue()
+_tracker_sender: Optional[threading.Thread] = None
+_tracker_sender_lock = threading.Lock()
+
+
+def _run_tracker_sender():
+    """Send queued tracker requests one at a time, forever"""
+    while True:
+        tracker_host, tracker_port, request, future = _tracker_outbox.get()
+        future.set_result(connect_to_tracker(tracker_host, tracker_port, request))
+
+
+def post_to_tracker(tracker_host: str, tracker_port: int, request: dict) -> Future:
+    """
+    Queue a request for the background tracker sender and return at once
+    
+    Args:
+        tracker_host: Tracker server host
+        tracker_port: Tracker server port
+        request: Request dictionary
+        
+    Returns:
+        Future resolving to the response dictionary, or None on error
+    """
+    global _tracker_sender
+    if _tracker_sender is None:
+        with _tracker_sender_lock:
+            if _tracker_sender is None:
+                _tracker_sender = threading.Thread(
+                    target=_run_tracker_sender, name='tracker-sender', daemon=True
+                )
+                _tracker_sender.start()
+    
+    future = Future()
+    _tracker_outbox.put((tracker_host, tracker_port, request, future))
+    return future
+
+
 def register_with_tracker(peer_id: str, peer_host: str, peer_port: int,
                          tracker_host: str = 'localhost',
                          tracker_port: int = 6000) -> bool:
@@ -206,6 +297,30 @@ def send_heartbeat(peer_id: str, tracker_host: str = 'localhost',
     return response and response.get('status') == 'success'
 
 
+def post_heartbeat(peer_id: str, tracker_host: str = 'localhost',
+                   tracker_port: int = 6000) -> Future:
+    """
+    Queue a heartbeat on the background tracker sender without waiting
+    
+    Args:
+        peer_id: Peer identifier
+        tracker_host: Tracker server host
+        tracker_port: Tracker server port
+        
+    Returns:
+        Future resolving to the tracker's response (None on error)
+    """
+    request = {
+        'type': 'HEARTBEAT',
+        'peer_id': peer_id
+    }
+    
+    return post_to_tracker(tracker_host, tracker_port, request)
+
+
+_SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB', 'PB')
+
+
 def format_file_size(size_bytes: int) -> str:
     """
     Format file size in human-readable format
@@ -216,11 +331,11 @@ def format_file_size(size_bytes: int) -> str:
     Returns:
         Formatted string (e.g., "1.5 MB")
     """
-    for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-        if size_bytes < 1024.0:
-            return f"{size_bytes:.1f} {unit}"
-        size_bytes /= 1024.0
-    return f"{size_bytes:.1f} PB"
+    if size_bytes < 1024:
+        return f"{size_bytes:.1f} B"
+    # Each unit is 2**10 of the previous one, so the bit length picks it directly
+    unit = min((int(size_bytes).bit_length() - 1) // 10, len(_SIZE_UNITS) - 1)
+    return f"{size_bytes / (1 << (unit * 10)):.1f} {_SIZE_UNITS[unit]}"
 
 
 def validate_port(port: int) -> bool:
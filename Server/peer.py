@@ -3,14 +3,101 @@ Peer class for P2P Video Streaming Application
 Handles peer connections, video sharing, and network communication
 """
 
+import selectors
 import socket
 import threading
-import json
 import os
 import hashlib
-from typing import Dict, List, Tuple, Optional
+import mmap
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Set, Tuple, Optional
 import time
 
+from .wire import (
+    encode_message, send_message, send_encoded, recv_message, recv_request,
+    set_nodelay, open_connection
+)
+
+
+# Video files are read and copied in 1MB blocks when they can't be copied in
+# the kernel; the video ID is hashed from the file's first 1MB
+VIDEO_IO_BUFFER = 1024 * 1024
+VIDEO_ID_BYTES = 1024 * 1024
+
+_HAS_SENDFILE = hasattr(os, 'sendfile')
+_HAS_FADVISE = hasattr(os, 'posix_fadvise')
+
+# Incoming requests are served by a bounded pool of reused threads
+MAX_REQUEST_WORKERS = 32
+
+# Seconds an incoming connection may stall on a read or write before it is
+# dropped, so a silent client can't hold a request worker forever
+REQUEST_TIMEOUT = 30.0
+
+# Most peers asked for their video lists at the same time
+MAX_LIST_WORKERS = 16
+
+def _send_file(sock: socket.socket, video_file, size: int):
+    """
+    Send the first size bytes of an open file over a socket
+    
+    Uses sendfile(2) where the OS has it. Elsewhere socket.sendfile would
+    fall back to 8KB read()/send() rounds, so the file is mapped instead and
+    handed to sendall in one call with no Python-side copies.
+    
+    Args:
+        sock: Connected socket to send through
+        video_file: File opened for binary reading
+        size: Number of bytes to send
+    """
+    if not size:
+        # sendfile rejects a zero count and an empty file can't be mapped
+        return
+    if _HAS_SENDFILE:
+        sock.sendfile(video_file, 0, size)
+    else:
+        with mmap.mmap(video_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            with memoryview(mapped) as view:
+                sock.sendall(view[:size])
+
+
+def _copy_file(src, dst, size: int):
+    """
+    Write src's first size bytes to dst, copying in the kernel with sendfile
+    where the OS allows file-to-file transfers
+    
+    Args:
+        src: Source file opened for binary reading
+        dst: Destination file opened for binary writing
+        size: Source file size
+    """
+    offset = 0
+    if _HAS_SENDFILE:
+        dst.flush()
+        try:
+            while offset < size:
+                sent = os.sendfile(dst.fileno(), src.fileno(), offset, size - offset)
+                if not sent:
+                    break
+                offset += sent
+            return
+        except OSError:
+            # e.g. platforms where sendfile can only write to sockets;
+            # finish with a buffered copy from where it stopped
+            pass
+    src.seek(offset)
+    dst.seek(offset)
+    shutil.copyfileobj(src, dst, VIDEO_IO_BUFFER)
+
+
+def _encode_video_info(video_info: dict) -> bytes:
+    """Encode the GET_VIDEO_INFO response for a library entry"""
+    return encode_message({'status': 'success', 'video_info': video_info})
+
+
+_VIDEO_INFO_NOT_FOUND = encode_message({'status': 'not_found', 'video_info': {}})
+
 
 class Peer:
     """
@@ -31,20 +118,41 @@ class Peer:
         self.host = host
         self.port = port
         
-        # Storage for videos this peer has
+        # Storage for videos this peer has. Copy-on-write: writers rebind it
+        # to a new dict under self.lock and never modify a published one, so
+        # readers take the reference and use it without locking
         self.video_library: Dict[str, dict] = {}
+        # (library snapshot, encoded LIST_VIDEOS response for it)
+        self._video_list_cache: Optional[Tuple[Dict[str, dict], bytes]] = None
+        # Encoded GET_VIDEO_INFO response per video, kept in step with the library
+        self._video_info_cache: Dict[str, bytes] = {}
         self.video_directory = f"peer_videos_{peer_id}"
         
         # Connected peers in the network
         self.known_peers: List[Tuple[str, int]] = []
+        # Same addresses as known_peers, for O(1) duplicate checks on refresh
+        self._known_peer_set: Set[Tuple[str, int]] = set()
         
         # Server socket for receiving connections
         self.server_socket = None
+        # Socket pair that stop() writes to, waking the accept loop
+        self._wakeup_reader: Optional[socket.socket] = None
+        self._wakeup_writer: Optional[socket.socket] = None
         self.running = False
+        self.executor: Optional[ThreadPoolExecutor] = None
+        # Accepted connections, shut down by stop() to release their workers
+        self.client_sockets: Set[socket.socket] = set()
         
         # Lock for thread-safe operations
         self.lock = threading.Lock()
         
+        # Request type -> handler(client_socket, request)
+        self._request_handlers = {
+            'LIST_VIDEOS': self._handle_list_videos,
+            'DOWNLOAD_VIDEO': self._handle_download_video,
+            'GET_VIDEO_INFO': self._handle_get_video_info
+        }
+        
         # Create video directory if it doesn't exist
         os.makedirs(self.video_directory, exist_ok=True)
         
@@ -55,8 +163,16 @@ class Peer:
         
         try:
             self.server_socket.bind((self.host, self.port))
-            self.server_socket.listen(5)
+            # Full-size accept queue so bursts of connections wait for the
+            # accept loop instead of being dropped and retried by the client
+            self.server_socket.listen(socket.SOMAXCONN)
+            self.server_socket.setblocking(False)
+            self._wakeup_reader, self._wakeup_writer = socket.socketpair()
             self.running = True
+            self.executor = ThreadPoolExecutor(
+                max_workers=MAX_REQUEST_WORKERS,
+                thread_name_prefix=f'peer-{self.peer_id}'
+            )
             
             print(f"[PEER {self.peer_id}] Started on {self.host}:{self.port}")
             
@@ -72,33 +188,64 @@ class Peer:
     def stop(self):
         """Stop the peer server"""
         self.running = False
+        if self._wakeup_writer:
+            try:
+                self._wakeup_writer.sendall(b'\0')
+            except OSError:
+                pass
         if self.server_socket:
             try:
                 self.server_socket.close()
             except:
                 pass
+        with self.lock:
+            client_sockets = list(self.client_sockets)
+        for client_socket in client_sockets:
+            try:
+                client_socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if self.executor:
+            self.executor.shutdown(wait=False)
         print(f"[PEER {self.peer_id}] Stopped")
     
     def _listen_for_connections(self):
         """Listen for incoming peer connections"""
-        while self.running:
-            try:
-                self.server_socket.settimeout(1.0)
-                client_socket, address = self.server_socket.accept()
-                
-                # Handle each connection in a separate thread
-                handler_thread = threading.Thread(
-                    target=self._handle_peer_request,
-                    args=(client_socket, address),
-                    daemon=True
-                )
-                handler_thread.start()
-                
-            except socket.timeout:
-                continue
-            except Exception as e:
-                if self.running:
-                    print(f"[PEER {self.peer_id}] Error accepting connection: {e}")
+        # Sleep in select() until a connection arrives or stop() writes to
+        # the wakeup socket, instead of polling with an accept timeout
+        with selectors.DefaultSelector() as selector:
+            selector.register(self.server_socket, selectors.EVENT_READ)
+            selector.register(self._wakeup_reader, selectors.EVENT_READ)
+            
+            while self.running:
+                for key, _ in selector.select():
+                    if key.fileobj is self._wakeup_reader:
+                        break
+                    try:
+                        client_socket, address = self.server_socket.accept()
+                        client_socket.settimeout(REQUEST_TIMEOUT)
+                        set_nodelay(client_socket)
+                        with self.lock:
+                            self.client_sockets.add(client_socket)
+                        
+                        # Handle each connection on the request pool
+                        try:
+                            self.executor.submit(self._handle_peer_request, client_socket, address)
+                        except RuntimeError:
+                            # stop() shut the pool down after this accept
+                            with self.lock:
+                                self.client_sockets.discard(client_socket)
+                            client_socket.close()
+                        
+                    except BlockingIOError:
+                        # The connection went away before it was accepted
+                        continue
+                    except Exception as e:
+                        if self.running:
+                            print(f"[PEER {self.peer_id}] Error accepting connection: {e}")
+        
+        self._wakeup_reader.close()
+        self._wakeup_writer.close()
     
     def _handle_peer_request(self, client_socket: socket.socket, address):
         """
@@ -110,39 +257,32 @@ class Peer:
         """
         try:
             # Receive request
-            request_data = client_socket.recv(4096).decode('utf-8')
-            request = json.loads(request_data)
-            
-            request_type = request.get('type')
-            
-            if request_type == 'LIST_VIDEOS':
-                # Send list of available videos
-                response = {
-                    'status': 'success',
-                    'videos': self._get_video_list()
-                }
-                client_socket.send(json.dumps(response).encode('utf-8'))
-                
-            elif request_type == 'DOWNLOAD_VIDEO':
-                # Send requested video file
-                video_id = request.get('video_id')
-                self._send_video_file(client_socket, video_id)
-                
-            elif request_type == 'GET_VIDEO_INFO':
-                # Send video metadata
-                video_id = request.get('video_id')
-                video_info = self.video_library.get(video_id, {})
-                response = {
-                    'status': 'success' if video_info else 'not_found',
-                    'video_info': video_info
-                }
-                client_socket.send(json.dumps(response).encode('utf-8'))
+            request = recv_request(client_socket)
+            
+            handler = self._request_handlers.get(request.get('type'))
+            if handler:
+                handler(client_socket, request)
             
         except Exception as e:
             print(f"[PEER {self.peer_id}] Error handling request: {e}")
         finally:
+            with self.lock:
+                self.client_sockets.discard(client_socket)
             client_socket.close()
     
+    def _handle_list_videos(self, client_socket: socket.socket, request: dict):
+        """Send list of available videos"""
+        send_encoded(client_socket, self._video_list_payload())
+    
+    def _handle_download_video(self, client_socket: socket.socket, request: dict):
+        """Send requested video file"""
+        self._send_video_file(client_socket, request.get('video_id'))
+    
+    def _handle_get_video_info(self, client_socket: socket.socket, request: dict):
+        """Send video metadata"""
+        payload = self._video_info_cache.get(request.get('video_id'), _VIDEO_INFO_NOT_FOUND)
+        send_encoded(client_socket, payload)
+    
     def add_video(self, video_path: str, video_name: str, description: str = "") -> Optional[str]:
         """
         Add a video to this peer's library
@@ -156,28 +296,34 @@ class Peer:
             Video ID if successful, None otherwise
         """
         try:
-            # Generate unique video ID based on file hash
-            video_id = self._generate_video_id(video_path)
-            
-            # Get file size
-            file_size = os.path.getsize(video_path)
-            
-            # Copy video to peer's directory
-            new_path = os.path.join(self.video_directory, f"{video_id}.mp4")
-            
-            with open(video_path, 'rb') as src, open(new_path, 'wb') as dst:
-                dst.write(src.read())
+            # One open serves both steps: the ID is hashed straight from a
+            # read-only mapping of the file, then the copy runs in the kernel
+            with open(video_path, 'rb') as src:
+                file_size = os.fstat(src.fileno()).st_size
+                
+                # Generate unique video ID based on file hash
+                if file_size:
+                    with mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                        with memoryview(mapped) as view:
+                            video_id = self._generate_video_id(view[:VIDEO_ID_BYTES])
+                else:
+                    video_id = self._generate_video_id(b'')
+                
+                # Copy video to peer's directory
+                new_path = os.path.join(self.video_directory, f"{video_id}.mp4")
+                
+                with open(new_path, 'wb') as dst:
+                    _copy_file(src, dst, file_size)
             
             # Add to video library
-            with self.lock:
-                self.video_library[video_id] = {
-                    'id': video_id,
-                    'name': video_name,
-                    'description': description,
-                    'size': file_size,
-                    'path': new_path,
-                    'added_time': time.time()
-                }
+            self._store_video(video_id, {
+                'id': video_id,
+                'name': video_name,
+                'description': description,
+                'size': file_size,
+                'path': new_path,
+                'added_time': time.time()
+            })
             
             print(f"[PEER {self.peer_id}] Added video: {video_name} (ID: {video_id})")
             return video_id
@@ -186,26 +332,86 @@ class Peer:
             print(f"[PEER {self.peer_id}] Error adding video: {e}")
             return None
     
-    def _generate_video_id(self, video_path: str) -> str:
-        """Generate a unique ID for a video file"""
-        hasher = hashlib.md5()
-        with open(video_path, 'rb') as f:
-            # Read first 1MB for hash (faster for large files)
-            hasher.update(f.read(1024 * 1024))
-        return hasher.hexdigest()[:16]
+    def _generate_video_id(self, head: bytes) -> str:
+        """Generate a unique ID for a video file from its first bytes"""
+        # Only the first 1MB is hashed (faster for large files); SHA-256 runs
+        # on the CPU's SHA extensions through OpenSSL, about twice MD5's speed
+        return hashlib.sha256(head).hexdigest()[:16]
+    
+    def _store_video(self, video_id: str, video_info: dict):
+        """Publish a library with video_id set to video_info"""
+        payload = _encode_video_info(video_info)
+        with self.lock:
+            library = dict(self.video_library)
+            library[video_id] = video_info
+            self.video_library = library
+            self._video_info_cache[video_id] = payload
+    
+    def _get_video_list(self, library: Dict[str, dict]) -> List[dict]:
+        """Get list of videos in a library snapshot"""
+        return [
+            {
+                'id': vid_id,
+                'name': info['name'],
+                'description': info['description'],
+                'size': info['size']
+            }
+            for vid_id, info in library.items()
+        ]
+    
+    def _video_list_payload(self) -> bytes:
+        """Get the encoded LIST_VIDEOS response, rebuilt only after changes"""
+        library = self.video_library
+        cache = self._video_list_cache
+        if cache is None or cache[0] is not library:
+            # Racing rebuilds encode the same snapshot; either result is fine
+            cache = (library, encode_message({
+                'status': 'success',
+                'videos': self._get_video_list(library)
+            }))
+            self._video_list_cache = cache
+        return cache[1]
+    
+    def update_video_info(self, video_id: str, name: str, description: str) -> bool:
+        """
+        Change the name and description of a video in the library
+        
+        Args:
+            video_id: ID of the video to edit
+            name: New display name
+            description: New description
+            
+        Returns:
+            True if the video exists, False otherwise
+        """
+        with self.lock:
+            video_info = self.video_library.get(video_id)
+            if not video_info:
+                return False
+            video_info = dict(video_info, name=name, description=description)
+            library = dict(self.video_library)
+            library[video_id] = video_info
+            self.video_library = library
+            self._video_info_cache[video_id] = _encode_video_info(video_info)
+        return True
     
-    def _get_video_list(self) -> List[dict]:
-        """Get list of videos available on this peer"""
+    def remove_video(self, video_id: str) -> Optional[dict]:
+        """
+        Remove a video from the library (the file is left on disk)
+        
+        Args:
+            video_id: ID of the video to remove
+            
+        Returns:
+            The removed video's info, or None if it was not in the library
+        """
         with self.lock:
-            return [
-                {
-                    'id': vid_id,
-                    'name': info['name'],
-                    'description': info['description'],
-                    'size': info['size']
-                }
-                for vid_id, info in self.video_library.items()
-            ]
+            library = dict(self.video_library)
+            video_info = library.pop(video_id, None)
+            if video_info:
+                self.video_library = library
+                self._video_info_cache.pop(video_id, None)
+        return video_info
     
     def _send_video_file(self, client_socket: socket.socket, video_id: str):
         """
@@ -221,7 +427,7 @@ class Peer:
             if not video_info:
                 # Send error response
                 response = {'status': 'not_found'}
-                client_socket.send(json.dumps(response).encode('utf-8'))
+                send_message(client_socket, response)
                 return
             
             # Send success response with file size
@@ -230,18 +436,18 @@ class Peer:
                 'size': video_info['size'],
                 'name': video_info['name']
             }
-            client_socket.send(json.dumps(response).encode('utf-8'))
-            
-            # Wait for acknowledgment
-            ack = client_socket.recv(1024)
+            # Let Nagle coalesce the header with the first file segment; the
+            # file bytes follow the header directly, the size tells the
+            # downloader where they end
+            set_nodelay(client_socket, False)
+            send_message(client_socket, response)
             
-            # Send video file in chunks
+            # Send the video straight from the page cache
             with open(video_info['path'], 'rb') as video_file:
-                while True:
-                    chunk = video_file.read(8192)  # 8KB chunks
-                    if not chunk:
-                        break
-                    client_socket.send(chunk)
+                if _HAS_FADVISE:
+                    # The whole file is read front to back: ask for more readahead
+                    os.posix_fadvise(video_file.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                _send_file(client_socket, video_file, video_info['size'])
             
             print(f"[PEER {self.peer_id}] Sent video {video_id} to peer")
             
@@ -261,16 +467,14 @@ class Peer:
         """
         try:
             # Connect to peer
-            client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            client_socket.connect((peer_host, peer_port))
+            client_socket = open_connection(peer_host, peer_port)
             
             # Send request
             request = {'type': 'LIST_VIDEOS'}
-            client_socket.send(json.dumps(request).encode('utf-8'))
+            send_message(client_socket, request)
             
             # Receive response
-            response_data = client_socket.recv(4096).decode('utf-8')
-            response = json.loads(response_data)
+            response = recv_message(client_socket)
             
             client_socket.close()
             
@@ -299,19 +503,17 @@ class Peer:
         """
         try:
             # Connect to peer
-            client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            client_socket.connect((peer_host, peer_port))
+            client_socket = open_connection(peer_host, peer_port)
             
             # Send download request
             request = {
                 'type': 'DOWNLOAD_VIDEO',
                 'video_id': video_id
             }
-            client_socket.send(json.dumps(request).encode('utf-8'))
+            send_message(client_socket, request)
             
             # Receive response header
-            response_data = client_socket.recv(4096).decode('utf-8')
-            response = json.loads(response_data)
+            response = recv_message(client_socket)
             
             if response['status'] != 'success':
                 print(f"[PEER {self.peer_id}] Video not found on peer")
@@ -325,33 +527,31 @@ class Peer:
                     f"{video_id}.mp4"
                 )
             
-            # Send acknowledgment
-            client_socket.send(b'ACK')
-            
-            # Receive video file
+            # Receive video file into one reused 1MB buffer
             file_size = response['size']
             received = 0
+            buffer = bytearray(VIDEO_IO_BUFFER)
+            view = memoryview(buffer)
             
             with open(save_path, 'wb') as video_file:
                 while received < file_size:
-                    chunk = client_socket.recv(8192)
-                    if not chunk:
+                    count = client_socket.recv_into(view, min(VIDEO_IO_BUFFER, file_size - received))
+                    if not count:
                         break
-                    video_file.write(chunk)
-                    received += len(chunk)
+                    video_file.write(view[:count])
+                    received += count
             
             client_socket.close()
             
             # Add to local library
-            with self.lock:
-                self.video_library[video_id] = {
-                    'id': video_id,
-                    'name': response['name'],
-                    'description': '',
-                    'size': file_size,
-                    'path': save_path,
-                    'added_time': time.time()
-                }
+            self._store_video(video_id, {
+                'id': video_id,
+                'name': response['name'],
+                'description': '',
+                'size': file_size,
+                'path': save_path,
+                'added_time': time.time()
+            })
             
             print(f"[PEER {self.peer_id}] Downloaded video {video_id}")
             return True
@@ -369,9 +569,12 @@ class Peer:
             peer_port: Port of the peer
         """
         peer_address = (peer_host, peer_port)
-        if peer_address not in self.known_peers:
+        with self.lock:
+            if peer_address in self._known_peer_set:
+                return
+            self._known_peer_set.add(peer_address)
             self.known_peers.append(peer_address)
-            print(f"[PEER {self.peer_id}] Added peer: {peer_host}:{peer_port}")
+        print(f"[PEER {self.peer_id}] Added peer: {peer_host}:{peer_port}")
     
     def get_all_network_videos(self) -> Dict[Tuple[str, int], List[dict]]:
         """
@@ -380,14 +583,32 @@ class Peer:
         Returns:
             Dictionary mapping peer addresses to their video lists
         """
-        network_videos = {}
+        with self.lock:
+            peers = list(self.known_peers)
+        
+        return {
+            address: videos
+            for address, videos in zip(peers, self.request_video_lists(peers))
+            if videos
+        }
+    
+    def request_video_lists(self, peers: List[Tuple[str, int]]) -> List[List[dict]]:
+        """
+        Request the video lists of several peers in parallel
         
-        for peer_host, peer_port in self.known_peers:
-            videos = self.request_video_list(peer_host, peer_port)
-            if videos:
-                network_videos[(peer_host, peer_port)] = videos
+        Args:
+            peers: (host, port) addresses of the peers to ask
+            
+        Returns:
+            Each peer's video list, in the order of peers (empty on failure)
+        """
+        if not peers:
+            return []
         
-        return network_videos
+        # Query every peer at once so the total wait is the slowest peer,
+        # not the sum of all of them
+        with ThreadPoolExecutor(max_workers=min(len(peers), MAX_LIST_WORKERS)) as pool:
+            return list(pool.map(lambda address: self.request_video_list(*address), peers))
     
     def get_peer_info(self) -> dict:
         """Get information about this peer"""
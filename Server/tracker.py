@@ -4,12 +4,75 @@ Helps peers discover each other and coordinate connections
 Addresses the centralized bottleneck issue mentioned by professor
 """
 
+import heapq
+import itertools
+import os
+import selectors
 import socket
+import sys
 import threading
-import json
-from typing import Dict, List, Tuple
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Set, Tuple, Optional
 import time
 
+from .wire import (
+    encode_message, decode_message, send_message, send_encoded, recv_request,
+    set_nodelay, set_keepalive
+)
+
+
+# Seconds a peer's open connection may sit without a request before the
+# tracker closes it; the peer reconnects on its next request
+CLIENT_IDLE_TIMEOUT = 60.0
+
+# Seconds a peer may take to finish sending a request it has started
+CLIENT_REQUEST_TIMEOUT = 10.0
+
+# Seconds without a heartbeat before a peer is dropped (5 minutes)
+PEER_TIMEOUT = 300.0
+
+# Requests are served by a bounded pool of reused threads. Idle connections
+# wait in the accept loop's selector, not on a worker, so this bounds the
+# requests handled at once rather than the number of connected peers
+MAX_CLIENT_WORKERS = 64
+
+# The registry and video index are saved here (at most every
+# STATE_SAVE_INTERVAL seconds, and on stop) and reloaded on start when the
+# file is under STATE_MAX_AGE seconds old, so a restarted tracker can answer
+# discovery requests before every peer has registered again. Relative to the
+# working directory; start_tracker.py takes --state-file / --no-state
+STATE_FILE = "tracker_state.json"
+STATE_SAVE_INTERVAL = 60.0
+STATE_MAX_AGE = 3600.0
+
+# Most FIND_VIDEO responses kept encoded; least recently used go first
+FIND_CACHE_SIZE = 4096
+
+_NO_PEERS = encode_message({'status': 'success', 'peers': [], 'count': 0})
+_UNKNOWN_REQUEST = encode_message({'status': 'error', 'message': 'Unknown request type'})
+
+
+def _intern(key):
+    """
+    Intern a peer or video ID so every index holding it shares one string
+    object (and compares by identity); other JSON values pass through
+    """
+    return sys.intern(key) if isinstance(key, str) else key
+
+
+class PeerEntry:
+    """A registered peer's address and when it was last heard from"""
+    
+    __slots__ = ('host', 'port', 'last_seen', 'encoded')
+    
+    def __init__(self, peer_id: str, host: str, port: int, last_seen: float):
+        self.host = host
+        self.port = port
+        self.last_seen = last_seen
+        # This peer's item in GET_PEERS responses, encoded once
+        self.encoded = encode_message({'peer_id': peer_id, 'host': host, 'port': port})
+
 
 class TrackerServer:
     """
@@ -18,27 +81,71 @@ class TrackerServer:
     is fully P2P, addressing scalability and fault tolerance concerns.
     """
     
-    def __init__(self, host: str = 'localhost', port: int = 6000):
+    def __init__(self, host: str = 'localhost', port: int = 6000,
+                 state_file: Optional[str] = STATE_FILE):
         """
         Initialize the tracker server
         
         Args:
             host: IP address to bind to
             port: Port number to listen on
+            state_file: Where to persist peers and videos across restarts,
+                or None to start empty every time
         """
         self.host = host
         self.port = port
+        self.state_file = state_file
+        
+        # Registry of active peers: {peer_id: PeerEntry}. Copy-on-write:
+        # writers rebind it to a new dict under self.lock and never modify a
+        # published one, so readers take the reference and use it unlocked
+        self.peer_registry: Dict[str, PeerEntry] = {}
         
-        # Registry of active peers: {peer_id: (host, port, last_seen)}
-        self.peer_registry: Dict[str, Tuple[str, int, float]] = {}
+        # Min-heap of (deadline, order, peer_id, entry) for the cleanup
+        # thread. Heartbeats don't touch it: an item whose peer has been
+        # seen since is pushed back with its new deadline when it comes up
+        self._expiry_heap: List[Tuple[float, int, str, PeerEntry]] = []
+        self._expiry_order = itertools.count()
         
-        # Video index: {video_id: [list of peer_ids that have it]}
-        self.video_index: Dict[str, List[str]] = {}
+        # Video index: {video_id: set of peer_ids that have it}
+        self.video_index: Dict[str, Set[str]] = {}
+        
+        # Reverse of video_index: {peer_id: set of video_ids it announced},
+        # so dropping a peer only touches its own videos
+        self.peer_videos: Dict[str, Set[str]] = {}
+        
+        # (registry snapshot, encoded GET_PEERS response for it)
+        self._peers_cache: Optional[Tuple[Dict[str, PeerEntry], bytes]] = None
+        
+        # Encoded FIND_VIDEO responses by video_id; an entry is dropped
+        # whenever that video's peers change
+        self._find_cache: 'OrderedDict[str, bytes]' = OrderedDict()
         
         self.server_socket = None
+        # Socket pair that stop() writes to, waking the accept loop
+        self._wakeup_reader: Optional[socket.socket] = None
+        self._wakeup_writer: Optional[socket.socket] = None
         self.running = False
+        self.executor: Optional[ThreadPoolExecutor] = None
+        # Open peer connections, closed by stop() to release their workers
+        self.client_sockets: Set[socket.socket] = set()
+        # Connections whose request has been answered, for the accept loop
+        # to watch again
+        self._rearm_sockets: List[socket.socket] = []
         self.lock = threading.Lock()
         
+        # Request type -> handler(request), returning a response dict or an
+        # already encoded response
+        self._request_handlers = {
+            'REGISTER': self._register_peer,
+            'UNREGISTER': self._unregister_peer,
+            'GET_PEERS': lambda request: self._peers_payload(),
+            'ANNOUNCE_VIDEO': self._announce_video,
+            'FIND_VIDEO': self._find_video,
+            'HEARTBEAT': self._update_heartbeat,
+            'GET_ALL_VIDEOS': lambda request: self._get_all_videos()
+        }
+        
     def start(self):
         """Start the tracker server"""
         self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -46,8 +153,19 @@ class TrackerServer:
         
         try:
             self.server_socket.bind((self.host, self.port))
-            self.server_socket.listen(10)
+            # Full-size accept queue so bursts of connections wait for the
+            # accept loop instead of being dropped and retried by the client
+            self.server_socket.listen(socket.SOMAXCONN)
+            self.server_socket.setblocking(False)
+            self._wakeup_reader, self._wakeup_writer = socket.socketpair()
+            self._wakeup_reader.setblocking(False)
+            self._wakeup_writer.setblocking(False)
             self.running = True
+            self.executor = ThreadPoolExecutor(
+                max_workers=MAX_CLIENT_WORKERS,
+                thread_name_prefix='tracker'
+            )
+            self._load_state()
             
             print(f"[TRACKER] Started on {self.host}:{self.port}")
             
@@ -65,92 +183,184 @@ class TrackerServer:
     def stop(self):
         """Stop the tracker server"""
         self.running = False
+        self._wake_listener()
         if self.server_socket:
             try:
                 self.server_socket.close()
             except:
                 pass
+        with self.lock:
+            client_sockets = list(self.client_sockets)
+        for client_socket in client_sockets:
+            try:
+                client_socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if self.executor:
+            self.executor.shutdown(wait=False)
+        self._save_state()
         print("[TRACKER] Stopped")
     
+    def _wake_listener(self):
+        """Interrupt the accept loop's select() call"""
+        try:
+            self._wakeup_writer.send(b'\0')
+        except (AttributeError, OSError):
+            # Not started, already closed, or a wakeup is already pending
+            pass
+    
     def _listen_for_connections(self):
-        """Listen for incoming peer connections"""
-        while self.running:
-            try:
-                self.server_socket.settimeout(1.0)
-                client_socket, address = self.server_socket.accept()
+        """Listen for incoming peer connections and requests"""
+        # Sleep in select() until a connection arrives, an idle connection
+        # sends a request, or a worker or stop() writes to the wakeup socket.
+        # Only connections with a request waiting are handed to the pool
+        with selectors.DefaultSelector() as selector:
+            selector.register(self.server_socket, selectors.EVENT_READ)
+            selector.register(self._wakeup_reader, selectors.EVENT_READ)
+            # Idle connection -> when it went idle, oldest first
+            idle: 'OrderedDict[socket.socket, float]' = OrderedDict()
+            
+            while self.running:
+                timeout = None
+                if idle:
+                    idle_since = next(iter(idle.values()))
+                    timeout = max(0.0, idle_since + CLIENT_IDLE_TIMEOUT - time.time())
                 
-                # Handle each connection in a separate thread
-                handler_thread = threading.Thread(
-                    target=self._handle_peer_request,
-                    args=(client_socket, address),
-                    daemon=True
-                )
-                handler_thread.start()
+                for key, _ in selector.select(timeout):
+                    if key.fileobj is self._wakeup_reader:
+                        try:
+                            self._wakeup_reader.recv(4096)
+                        except BlockingIOError:
+                            pass
+                    elif key.fileobj is self.server_socket:
+                        self._accept_connection(selector, idle)
+                    else:
+                        client_socket = key.fileobj
+                        selector.unregister(client_socket)
+                        del idle[client_socket]
+                        self._submit(client_socket)
                 
-            except socket.timeout:
-                continue
-            except Exception as e:
-                if self.running:
-                    print(f"[TRACKER] Error accepting connection: {e}")
+                if not self.running:
+                    break
+                
+                now = time.time()
+                with self.lock:
+                    rearm, self._rearm_sockets = self._rearm_sockets, []
+                for client_socket in rearm:
+                    selector.register(client_socket, selectors.EVENT_READ)
+                    idle[client_socket] = now
+                
+                # Close connections that have been idle too long
+                while idle:
+                    client_socket, idle_since = next(iter(idle.items()))
+                    if idle_since + CLIENT_IDLE_TIMEOUT > now:
+                        break
+                    del idle[client_socket]
+                    selector.unregister(client_socket)
+                    self._close_client(client_socket)
+            
+            with self.lock:
+                rearm, self._rearm_sockets = self._rearm_sockets, []
+            for client_socket in itertools.chain(idle, rearm):
+                self._close_client(client_socket)
+        
+        self._wakeup_reader.close()
+        self._wakeup_writer.close()
     
-    def _handle_peer_request(self, client_socket: socket.socket, address):
+    def _accept_connection(self, selector: selectors.BaseSelector,
+                           idle: 'OrderedDict[socket.socket, float]'):
+        """Accept a waiting connection and watch it for its first request"""
+        try:
+            client_socket, address = self.server_socket.accept()
+            client_socket.settimeout(CLIENT_REQUEST_TIMEOUT)
+            set_nodelay(client_socket)
+            # Peers hold this connection open between requests
+            set_keepalive(client_socket)
+            
+            with self.lock:
+                self.client_sockets.add(client_socket)
+            selector.register(client_socket, selectors.EVENT_READ)
+            idle[client_socket] = time.time()
+            
+        except BlockingIOError:
+            # The connection went away before it was accepted
+            pass
+        except Exception as e:
+            if self.running:
+                print(f"[TRACKER] Error accepting connection: {e}")
+    
+    def _submit(self, client_socket: socket.socket):
+        """Hand a connection with a request waiting to a pooled thread"""
+        try:
+            self.executor.submit(self._handle_peer_request, client_socket)
+        except RuntimeError:
+            # stop() shut the pool down
+            self._close_client(client_socket)
+    
+    def _close_client(self, client_socket: socket.socket):
+        """Forget and close a peer connection"""
+        with self.lock:
+            self.client_sockets.discard(client_socket)
+        client_socket.close()
+    
+    def _handle_peer_request(self, client_socket: socket.socket):
         """
-        Handle requests from peers
+        Serve one request from a peer
+        
+        The connection is handed back to the accept loop afterwards, so
+        the peer can keep it open for its next request without holding a
+        worker in between.
         
         Args:
-            client_socket: Socket connection to the peer
-            address: Address of the peer
+            client_socket: Socket connection to the peer, with a request
+                waiting to be read
         """
         try:
-            # Receive request
-            request_data = client_socket.recv(4096).decode('utf-8')
-            request = json.loads(request_data)
-            
-            request_type = request.get('type')
-            
-            if request_type == 'REGISTER':
-                # Register a new peer
-                response = self._register_peer(request)
-                
-            elif request_type == 'UNREGISTER':
-                # Unregister a peer
-                response = self._unregister_peer(request)
-                
-            elif request_type == 'GET_PEERS':
-                # Get list of all active peers
-                response = self._get_all_peers()
-                
-            elif request_type == 'ANNOUNCE_VIDEO':
-                # Peer announces it has a video
-                response = self._announce_video(request)
-                
-            elif request_type == 'FIND_VIDEO':
-                # Find peers that have a specific video
-                response = self._find_video(request)
-                
-            elif request_type == 'HEARTBEAT':
-                # Peer heartbeat to stay active
-                response = self._update_heartbeat(request)
-
-            elif request_type == 'GET_ALL_VIDEOS':
-                # Get all videos in the index
-                response = self._get_all_videos()
-                
-            else:
-                response = {'status': 'error', 'message': 'Unknown request type'}
+            try:
+                # Receive request
+                request = recv_request(client_socket)
+            except (ConnectionError, socket.timeout):
+                # Peer closed the connection or stalled mid-request
+                self._close_client(client_socket)
+                return
             
             # Send response
-            client_socket.send(json.dumps(response).encode('utf-8'))
+            send_encoded(client_socket, self._process_request(request))
             
         except Exception as e:
             print(f"[TRACKER] Error handling request: {e}")
             error_response = {'status': 'error', 'message': str(e)}
             try:
-                client_socket.send(json.dumps(error_response).encode('utf-8'))
+                send_message(client_socket, error_response)
             except:
                 pass
-        finally:
-            client_socket.close()
+            self._close_client(client_socket)
+            return
+        
+        if not self.running:
+            self._close_client(client_socket)
+            return
+        
+        with self.lock:
+            self._rearm_sockets.append(client_socket)
+        self._wake_listener()
+    
+    def _process_request(self, request: dict) -> bytes:
+        """
+        Dispatch one request to its handler
+        
+        Args:
+            request: Decoded request message
+            
+        Returns:
+            Encoded response message
+        """
+        handler = self._request_handlers.get(request.get('type'))
+        if handler is None:
+            return _UNKNOWN_REQUEST
+        
+        response = handler(request)
+        return response if isinstance(response, bytes) else encode_message(response)
     
     def _register_peer(self, request: dict) -> dict:
         """
@@ -162,7 +372,7 @@ class TrackerServer:
         Returns:
             Response dictionary
         """
-        peer_id = request.get('peer_id')
+        peer_id = _intern(request.get('peer_id'))
         peer_host = request.get('host')
         peer_port = request.get('port')
         
@@ -170,7 +380,16 @@ class TrackerServer:
             return {'status': 'error', 'message': 'Missing peer information'}
         
         with self.lock:
-            self.peer_registry[peer_id] = (peer_host, peer_port, time.time())
+            entry = PeerEntry(peer_id, peer_host, peer_port, time.time())
+            registry = dict(self.peer_registry)
+            registry[peer_id] = entry
+            self.peer_registry = registry
+            heapq.heappush(self._expiry_heap, (
+                entry.last_seen + PEER_TIMEOUT, next(self._expiry_order), peer_id, entry
+            ))
+            # The peer's address (or presence) in FIND_VIDEO results changed
+            for video_id in self.peer_videos.get(peer_id, ()):
+                self._find_cache.pop(video_id, None)
         
         print(f"[TRACKER] Registered peer: {peer_id} at {peer_host}:{peer_port}")
         
@@ -194,43 +413,38 @@ class TrackerServer:
         
         with self.lock:
             if peer_id in self.peer_registry:
-                del self.peer_registry[peer_id]
-                
-                # Remove from video index
-                for video_id in list(self.video_index.keys()):
-                    if peer_id in self.video_index[video_id]:
-                        self.video_index[video_id].remove(peer_id)
-                    if not self.video_index[video_id]:
-                        del self.video_index[video_id]
+                self._drop_peers([peer_id])
         
         print(f"[TRACKER] Unregistered peer: {peer_id}")
         
         return {'status': 'success', 'message': 'Peer unregistered'}
     
-    def _get_all_peers(self) -> dict:
+    def _peers_payload(self) -> bytes:
+        """Get the encoded GET_PEERS response, rebuilt only after registry changes"""
+        registry = self.peer_registry
+        cache = self._peers_cache
+        if cache is None or cache[0] is not registry:
+            # Racing rebuilds encode the same snapshot; either result is fine
+            cache = (registry, self._get_all_peers(registry))
+            self._peers_cache = cache
+        return cache[1]
+    
+    def _get_all_peers(self, registry: Dict[str, PeerEntry]) -> bytes:
         """
-        Get list of all active peers
+        Get list of all active peers in a registry snapshot
     
         Returns:
-            Response with list of peers
+            Encoded response with list of peers
         """
-        with self.lock:
-            peers = [
-                {
-                    'peer_id': peer_id,
-                    'host': host,
-                    'port': port
-                }
-                for peer_id, (host, port, last_seen) in self.peer_registry.items()
-            ]
+        print(f"[TRACKER] Returning {len(registry)} peers: {list(registry)}")  # Debug line
     
-        print(f"[TRACKER] Returning {len(peers)} peers: {peers}")  # Debug line
-    
-        return {
-            'status': 'success',
-            'peers': peers,
-            'count': len(peers)
-        }
+        # Splice the peers' pre-encoded items into the response instead of
+        # building and encoding a dict per peer
+        return (
+            b'{"status":"success","peers":['
+            + b','.join(entry.encoded for entry in registry.values())
+            + b'],"count":%d}' % len(registry)
+        )
     
     def _announce_video(self, request: dict) -> dict:
         """
@@ -242,24 +456,22 @@ class TrackerServer:
         Returns:
             Response dictionary
         """
-        peer_id = request.get('peer_id')
-        video_id = request.get('video_id')
+        peer_id = _intern(request.get('peer_id'))
+        video_id = _intern(request.get('video_id'))
         
         if not all([peer_id, video_id]):
             return {'status': 'error', 'message': 'Missing information'}
         
         with self.lock:
-            if video_id not in self.video_index:
-                self.video_index[video_id] = []
-            
-            if peer_id not in self.video_index[video_id]:
-                self.video_index[video_id].append(peer_id)
+            self.video_index.setdefault(video_id, set()).add(peer_id)
+            self.peer_videos.setdefault(peer_id, set()).add(video_id)
+            self._find_cache.pop(video_id, None)
         
         print(f"[TRACKER] Peer {peer_id} announced video {video_id}")
         
         return {'status': 'success', 'message': 'Video announced'}
     
-    def _find_video(self, request: dict) -> dict:
+    def _find_video(self, request: dict) -> bytes:
         """
         Find which peers have a specific video
         
@@ -267,29 +479,44 @@ class TrackerServer:
             request: Video search request
             
         Returns:
-            Response with list of peers that have the video
+            Encoded response with list of peers that have the video
         """
         video_id = request.get('video_id')
-        
+
+        # Unknown videos are answered without waiting for the lock; a
+        # membership test on the dict is atomic
+        if video_id not in self.video_index:
+            return _NO_PEERS
+
         with self.lock:
-            peer_ids = self.video_index.get(video_id, [])
+            payload = self._find_cache.get(video_id)
+            if payload is not None:
+                self._find_cache.move_to_end(video_id)
+                return payload
+            
+            peer_ids = self.video_index.get(video_id, ())
             
             # Get full peer information
             peers_with_video = []
             for peer_id in peer_ids:
-                if peer_id in self.peer_registry:
-                    host, port, _ = self.peer_registry[peer_id]
+                entry = self.peer_registry.get(peer_id)
+                if entry:
                     peers_with_video.append({
                         'peer_id': peer_id,
-                        'host': host,
-                        'port': port
+                        'host': entry.host,
+                        'port': entry.port
                     })
+            
+            payload = encode_message({
+                'status': 'success',
+                'peers': peers_with_video,
+                'count': len(peers_with_video)
+            })
+            self._find_cache[video_id] = payload
+            if len(self._find_cache) > FIND_CACHE_SIZE:
+                self._find_cache.popitem(last=False)
         
-        return {
-            'status': 'success',
-            'peers': peers_with_video,
-            'count': len(peers_with_video)
-        }
+        return payload
     
     def _get_all_videos(self) -> dict:
         """
@@ -305,12 +532,12 @@ class TrackerServer:
             for video_id, peer_ids in self.video_index.items():
                 peers_with_video = []
                 for peer_id in peer_ids:
-                    if peer_id in self.peer_registry:
-                        host, port, _ = self.peer_registry[peer_id]
+                    entry = self.peer_registry.get(peer_id)
+                    if entry:
                         peers_with_video.append({
                             'peer_id': peer_id,
-                            'host': host,
-                            'port': port
+                            'host': entry.host,
+                            'port': entry.port
                         })
             
                 if peers_with_video:
@@ -334,63 +561,166 @@ class TrackerServer:
         """
         peer_id = request.get('peer_id')
         
-        with self.lock:
-            if peer_id in self.peer_registry:
-                host, port, _ = self.peer_registry[peer_id]
-                self.peer_registry[peer_id] = (host, port, time.time())
+        # Unknown peers are answered without the lock. A cleanup pass may
+        # have read the old time and be evicting the peer right now, so the
+        # success check takes the lock: once it is held, that pass has either
+        # finished (the peer is gone and must register again) or not yet
+        # read the time (and sees the new one)
+        entry = self.peer_registry.get(peer_id)
+        if entry:
+            entry.last_seen = time.time()
+            with self.lock:
+                registered = self.peer_registry.get(peer_id) is entry
+            if registered:
                 return {'status': 'success'}
-            else:
-                return {'status': 'error', 'message': 'Peer not registered'}
+        return {'status': 'error', 'message': 'Peer not registered'}
+    
+    def _drop_peers(self, peer_ids: List[str]):
+        """
+        Remove registered peers and their announcements (caller holds self.lock)
+        
+        Args:
+            peer_ids: IDs of the peers to remove
+        """
+        registry = dict(self.peer_registry)
+        for peer_id in peer_ids:
+            del registry[peer_id]
+        self.peer_registry = registry
+        
+        # Remove from video index
+        for peer_id in peer_ids:
+            for video_id in self.peer_videos.pop(peer_id, ()):
+                self._find_cache.pop(video_id, None)
+                video_peers = self.video_index[video_id]
+                video_peers.discard(peer_id)
+                if not video_peers:
+                    del self.video_index[video_id]
     
     def _cleanup_inactive_peers(self):
         """Remove peers that haven't sent heartbeat in a while"""
-        TIMEOUT = 300  # 5 minutes
-        
         while self.running:
+            # Nothing can expire sooner than a peer registered right now
+            delay = PEER_TIMEOUT
             try:
-                time.sleep(60)  # Check every minute
-                
                 current_time = time.time()
+                inactive_peers = []
+                
                 with self.lock:
-                    inactive_peers = [
-                        peer_id
-                        for peer_id, (host, port, last_seen) in self.peer_registry.items()
-                        if current_time - last_seen > TIMEOUT
-                    ]
-                    
-                    for peer_id in inactive_peers:
-                        print(f"[TRACKER] Removing inactive peer: {peer_id}")
-                        del self.peer_registry[peer_id]
+                    heap = self._expiry_heap
+                    while heap and heap[0][0] <= current_time:
+                        _, _, peer_id, entry = heapq.heappop(heap)
+                        if self.peer_registry.get(peer_id) is not entry:
+                            # Unregistered, or registered again since
+                            continue
                         
-                        # Clean up video index
-                        for video_id in list(self.video_index.keys()):
-                            if peer_id in self.video_index[video_id]:
-                                self.video_index[video_id].remove(peer_id)
-                            if not self.video_index[video_id]:
-                                del self.video_index[video_id]
+                        deadline = entry.last_seen + PEER_TIMEOUT
+                        if deadline <= current_time:
+                            inactive_peers.append(peer_id)
+                        else:
+                            heapq.heappush(heap, (deadline, next(self._expiry_order), peer_id, entry))
+                    
+                    if inactive_peers:
+                        self._drop_peers(inactive_peers)
+                    
+                    if heap:
+                        delay = heap[0][0] - current_time
+                
+                for peer_id in inactive_peers:
+                    print(f"[TRACKER] Removed inactive peer: {peer_id}")
+                
+                if self.state_file:
+                    self._save_state()
+                    delay = min(delay, STATE_SAVE_INTERVAL)
                 
             except Exception as e:
                 print(f"[TRACKER] Error in cleanup: {e}")
+            
+            # Sleep until the earliest deadline (or the next save)
+            time.sleep(delay)
+    
+    def _save_state(self):
+        """Write the registry and video index to the state file"""
+        if not self.state_file:
+            return
+        
+        try:
+            with self.lock:
+                state = {
+                    'peers': {
+                        peer_id: [entry.host, entry.port]
+                        for peer_id, entry in self.peer_registry.items()
+                    },
+                    'videos': {
+                        video_id: list(peer_ids)
+                        for video_id, peer_ids in self.video_index.items()
+                    }
+                }
+            
+            temp_file = self.state_file + ".tmp"
+            with open(temp_file, 'wb') as f:
+                f.write(encode_message(state))
+            os.replace(temp_file, self.state_file)
+        except Exception as e:
+            print(f"[TRACKER] Error saving state: {e}")
+    
+    def _load_state(self):
+        """Restore the registry and video index from a recent state file"""
+        if not self.state_file or not os.path.exists(self.state_file):
+            return
+        
+        try:
+            if time.time() - os.path.getmtime(self.state_file) > STATE_MAX_AGE:
+                return
+            
+            with open(self.state_file, 'rb') as f:
+                state = decode_message(f.read())
+            
+            # Restored peers get a full PEER_TIMEOUT to send a heartbeat
+            now = time.time()
+            with self.lock:
+                registry = dict(self.peer_registry)
+                for peer_id, (host, port) in state['peers'].items():
+                    peer_id = _intern(peer_id)
+                    entry = PeerEntry(peer_id, host, port, now)
+                    registry[peer_id] = entry
+                    heapq.heappush(self._expiry_heap, (
+                        now + PEER_TIMEOUT, next(self._expiry_order), peer_id, entry
+                    ))
+                self.peer_registry = registry
+                
+                for video_id, peer_ids in state['videos'].items():
+                    video_id = _intern(video_id)
+                    peer_ids = [_intern(peer_id) for peer_id in peer_ids]
+                    self.video_index.setdefault(video_id, set()).update(peer_ids)
+                    for peer_id in peer_ids:
+                        self.peer_videos.setdefault(peer_id, set()).add(video_id)
+            
+            print(f"[TRACKER] Restored {len(state['peers'])} peers and "
+                  f"{len(state['videos'])} videos from {self.state_file}")
+        except Exception as e:
+            print(f"[TRACKER] Error loading state: {e}")
     
     def get_stats(self) -> dict:
         """Get tracker statistics"""
-        with self.lock:
-            return {
-                'active_peers': len(self.peer_registry),
-                'indexed_videos': len(self.video_index),
-                'peers': list(self.peer_registry.keys())
-            }
+        registry = self.peer_registry
+        return {
+            'active_peers': len(registry),
+            'indexed_videos': len(self.video_index),
+            'peers': list(registry.keys())
+        }
 
 
-def start_tracker_server(host: str = 'localhost', port: int = 6000):
+def start_tracker_server(host: str = 'localhost', port: int = 6000,
+                         state_file: Optional[str] = STATE_FILE):
     """
     Convenience function to start the tracker server
     
     Args:
         host: Host address
         port: Port number
+        state_file: Where to persist peers and videos, or None to disable
     """
-    tracker = TrackerServer(host, port)
+    tracker = TrackerServer(host, port, state_file)
     try:
         tracker.start()
     except KeyboardInterrupt:
@@ -3,13 +3,175 @@ User Profile Management for P2P Video Streaming
 Handles saving and loading user profiles
 """
 
+import atexit
+import hashlib
 import json
 import os
-from typing import Optional, List, Dict
+import re
+import shutil
+import threading
+from typing import Optional, List, Dict, Set, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 PROFILES_DIR = "user_profiles"
+# Single file that held every profile before they were split per peer;
+# read once to migrate it
 PROFILES_FILE = os.path.join(PROFILES_DIR, "profiles.json")
 
+# Each profile lives in its own PROFILES_DIR/<peer_id>.json and is written
+# there as soon as it changes. Reads are served from _profiles_cache, which
+# is rescanned whenever the directory's mtime shows another process (e.g. a
+# second app instance) added, replaced or removed a profile file
+_cache_lock = threading.Lock()
+_profiles_cache: Optional[Dict[str, Dict]] = None
+# Directory mtime (ns) the cache was scanned at
+_profiles_dir_mtime: Optional[int] = None
+# Profile file path -> (file mtime in ns, profile), so a rescan only parses
+# the files that changed
+_profile_files: Dict[str, Tuple[int, Dict]] = {}
+# Peers whose change could not be written yet; flush_profiles retries them
+_dirty_peer_ids: Set[str] = set()
+
+def _profile_file(peer_id: str) -> str:
+    """Get the path of a peer's profile file"""
+    name = re.sub(r"[^A-Za-z0-9._-]", "_", peer_id)
+    if name != peer_id:
+        # Keep IDs that only differ in replaced characters apart
+        name += "-" + hashlib.sha1(peer_id.encode('utf-8')).hexdigest()[:8]
+    return os.path.join(PROFILES_DIR, f"{name}.json")
+
+def _read_json(path: str):
+    """Parse a JSON file"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+def _write_json(path: str, value):
+    """Atomically replace a file with value as indented JSON"""
+    if orjson is not None:
+        data = orjson.dumps(value, option=orjson.OPT_INDENT_2)
+    else:
+        data = json.dumps(value, indent=2).encode('utf-8')
+    
+    temp_file = path + ".tmp"
+    with open(temp_file, 'wb') as f:
+        f.write(data)
+    os.replace(temp_file, path)
+
+def _copy_profile(profile: Dict) -> Dict:
+    """Copy a cached profile so callers can modify it freely"""
+    return dict(profile, friends=[dict(friend) for friend in profile.get('friends', [])])
+
+def _migrate_profiles_file(profiles: Dict[str, Dict]):
+    """Split the old shared profiles.json into per-peer files"""
+    data = _read_json(PROFILES_FILE)
+    if isinstance(data, dict) and 'peer_id' in data:
+        # Already the profile file of a peer whose ID is "profiles"
+        profiles[data['peer_id']] = data
+        return
+    
+    # The shared file stored a list, later a dict keyed by peer ID
+    legacy = data if isinstance(data, list) else list(data.values())
+    for profile in legacy:
+        profiles.setdefault(profile['peer_id'], profile)
+        _write_json(_profile_file(profile['peer_id']), profiles[profile['peer_id']])
+    
+    if all(_profile_file(profile['peer_id']) != PROFILES_FILE for profile in legacy):
+        os.remove(PROFILES_FILE)
+
+def _load_cache() -> Dict[str, Dict]:
+    """Get the profile cache, rescanning PROFILES_DIR if it changed (caller holds _cache_lock)"""
+    global _profiles_cache, _profiles_dir_mtime, _profile_files
+    
+    ensure_profiles_directory()
+    dir_mtime = os.stat(PROFILES_DIR).st_mtime_ns
+    if _profiles_cache is not None and dir_mtime == _profiles_dir_mtime:
+        return _profiles_cache
+    
+    profiles = {}
+    profile_files = {}
+    for name in os.listdir(PROFILES_DIR):
+        path = os.path.join(PROFILES_DIR, name)
+        if not name.endswith('.json') or path == PROFILES_FILE:
+            continue
+        try:
+            mtime = os.stat(path).st_mtime_ns
+            cached = _profile_files.get(path)
+            if cached is not None and cached[0] == mtime:
+                profile = cached[1]
+            else:
+                profile = _read_json(path)
+            profiles[profile['peer_id']] = profile
+            profile_files[path] = (mtime, profile)
+        except Exception as e:
+            print(f"Error loading profile {name}: {e}")
+    
+    if os.path.exists(PROFILES_FILE):
+        try:
+            _migrate_profiles_file(profiles)
+        except Exception as e:
+            print(f"Error loading profiles: {e}")
+    
+    # Changes that haven't reached the disk yet win over what is there
+    if _profiles_cache is not None:
+        for peer_id in _dirty_peer_ids:
+            profile = _profiles_cache.get(peer_id)
+            if profile is not None:
+                profiles[peer_id] = profile
+            else:
+                profiles.pop(peer_id, None)
+    
+    _profiles_cache = profiles
+    _profiles_dir_mtime = dir_mtime
+    _profile_files = profile_files
+    return profiles
+
+def _write_profile(peer_id: str) -> bool:
+    """
+    Write a peer's cached profile to its file, or remove the file if the
+    profile was deleted (caller holds _cache_lock)
+    
+    Returns:
+        True if successful; on failure the peer is left for flush_profiles
+    """
+    path = _profile_file(peer_id)
+    profile = _profiles_cache.get(peer_id)
+    try:
+        if profile is not None:
+            _write_json(path, profile)
+            _profile_files[path] = (os.stat(path).st_mtime_ns, profile)
+        else:
+            _profile_files.pop(path, None)
+            if os.path.exists(path):
+                os.remove(path)
+        _dirty_peer_ids.discard(peer_id)
+        return True
+    except Exception as e:
+        print(f"Error saving profile {peer_id}: {e}")
+        _dirty_peer_ids.add(peer_id)
+        return False
+
+def flush_profiles() -> bool:
+    """
+    Retry writing profile changes that failed to reach the disk
+    
+    Returns:
+        True if successful (or nothing was pending)
+    """
+    with _cache_lock:
+        success = True
+        for peer_id in list(_dirty_peer_ids):
+            if not _write_profile(peer_id):
+                success = False
+        return success
+
+# Failed writes get a last attempt on exit
+atexit.register(flush_profiles)
+
 def ensure_profiles_directory():
     """Ensure the profiles directory exists"""
     if not os.path.exists(PROFILES_DIR):
@@ -22,17 +184,8 @@ def load_all_profiles() -> List[Dict]:
     Returns:
         List of profile dictionaries
     """
-    ensure_profiles_directory()
-    
-    if not os.path.exists(PROFILES_FILE):
-        return []
-    
-    try:
-        with open(PROFILES_FILE, 'r') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"Error loading profiles: {e}")
-        return []
+    with _cache_lock:
+        return [_copy_profile(profile) for profile in _load_cache().values()]
 
 def save_profile(peer_id: str, port: int, tracker_host: str, tracker_port: int, 
                 friends: List[Dict] = None) -> bool:
@@ -49,42 +202,18 @@ def save_profile(peer_id: str, port: int, tracker_host: str, tracker_port: int,
     Returns:
         True if successful
     """
-    ensure_profiles_directory()
-    
-    profiles = load_all_profiles()
-    
-    # Check if profile exists
-    profile_exists = False
-    for i, profile in enumerate(profiles):
-        if profile['peer_id'] == peer_id:
-            # Update existing profile
-            profiles[i] = {
-                'peer_id': peer_id,
-                'port': port,
-                'tracker_host': tracker_host,
-                'tracker_port': tracker_port,
-                'friends': friends or []
-            }
-            profile_exists = True
-            break
-    
-    if not profile_exists:
-        # Add new profile
-        profiles.append({
-            'peer_id': peer_id,
-            'port': port,
-            'tracker_host': tracker_host,
-            'tracker_port': tracker_port,
-            'friends': friends or []
-        })
+    profile = _copy_profile({
+        'peer_id': peer_id,
+        'port': port,
+        'tracker_host': tracker_host,
+        'tracker_port': tracker_port,
+        'friends': friends or []
+    })
     
-    try:
-        with open(PROFILES_FILE, 'w') as f:
-            json.dump(profiles, f, indent=2)
-        return True
-    except Exception as e:
-        print(f"Error saving profile: {e}")
-        return False
+    with _cache_lock:
+        # Add the profile, or replace the existing one in place
+        _load_cache()[peer_id] = profile
+        return _write_profile(peer_id)
 
 def load_profile(peer_id: str) -> Optional[Dict]:
     """
@@ -96,13 +225,9 @@ def load_profile(peer_id: str) -> Optional[Dict]:
     Returns:
         Profile dictionary or None
     """
-    profiles = load_all_profiles()
-    
-    for profile in profiles:
-        if profile['peer_id'] == peer_id:
-            return profile
-    
-    return None
+    with _cache_lock:
+        profile = _load_cache().get(peer_id)
+        return _copy_profile(profile) if profile else None
 
 def delete_profile(peer_id: str) -> bool:
     """
@@ -114,19 +239,14 @@ def delete_profile(peer_id: str) -> bool:
     Returns:
         True if successful
     """
-    ensure_profiles_directory()
-    
-    profiles = load_all_profiles()
-    profiles = [p for p in profiles if p['peer_id'] != peer_id]
+    with _cache_lock:
+        if _load_cache().pop(peer_id, None) is not None and not _write_profile(peer_id):
+            return False
     
     try:
-        with open(PROFILES_FILE, 'w') as f:
-            json.dump(profiles, f, indent=2)
-        
         # Also delete the peer's video directory
         video_dir = f"peer_videos_{peer_id}"
         if os.path.exists(video_dir):
-            import shutil
             shutil.rmtree(video_dir)
         
         return True
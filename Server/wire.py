@@ -0,0 +1,194 @@
+"""
+Wire Format for P2P Video Streaming Application
+Length-prefixed message framing shared by peers and the tracker
+"""
+
+import json
+import socket
+import struct
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Every control message is a 4-byte big-endian payload length followed by
+# the JSON payload, so receivers read exactly one message regardless of how
+# TCP splits or merges the bytes
+_LENGTH = struct.Struct('>I')
+
+# Upper bound on a single control message; anything larger is a corrupt or
+# hostile length prefix, not a real request
+MAX_MESSAGE_SIZE = 16 * 1024 * 1024
+
+# Requests only carry a type and a few IDs; servers refuse anything bigger
+# before reading or parsing it
+MAX_REQUEST_SIZE = 8 * 1024
+
+# Keepalive timing for connections that stay open between requests
+KEEPALIVE_IDLE = 30
+KEEPALIVE_INTERVAL = 10
+KEEPALIVE_COUNT = 3
+
+
+# Payloads are encoded with orjson when it is installed (bytes in, bytes
+# out); the stdlib fallback produces the same JSON on the wire
+if orjson is not None:
+    encode_message = orjson.dumps
+    decode_message = orjson.loads
+else:
+    def encode_message(data) -> bytes:
+        """Serialize a message to UTF-8 JSON bytes"""
+        return json.dumps(data).encode('utf-8')
+
+    def decode_message(data: bytes):
+        """Parse a message from JSON bytes"""
+        return json.loads(data)
+
+
+def set_nodelay(sock: socket.socket, enabled: bool = True) -> None:
+    """
+    Turn Nagle's algorithm off (enabled=True) or back on for a TCP socket
+
+    Control messages are single small writes that should leave immediately;
+    bulk file transfers turn it back on so partial segments get coalesced.
+    """
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, int(enabled))
+
+
+def set_keepalive(sock: socket.socket) -> None:
+    """
+    Turn on TCP keepalive for a long-lived connection
+
+    Probes start after KEEPALIVE_IDLE idle seconds and repeat every
+    KEEPALIVE_INTERVAL; after KEEPALIVE_COUNT unanswered probes the
+    connection fails, so a vanished host is noticed in about a minute.
+    Tuning options the platform lacks are skipped.
+    """
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    for name, value in (
+        ('TCP_KEEPIDLE', KEEPALIVE_IDLE),
+        ('TCP_KEEPINTVL', KEEPALIVE_INTERVAL),
+        ('TCP_KEEPCNT', KEEPALIVE_COUNT)
+    ):
+        option = getattr(socket, name, None)
+        if option is not None:
+            try:
+                sock.setsockopt(socket.IPPROTO_TCP, option, value)
+            except OSError:
+                pass
+
+
+def open_connection(host: str, port: int) -> socket.socket:
+    """
+    Open a TCP connection for control messages
+
+    Args:
+        host: Host to connect to
+        port: Port to connect to
+
+    Returns:
+        Connected socket with TCP_NODELAY set
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.connect((host, port))
+    set_nodelay(sock)
+    return sock
+
+
+def recv_exact(sock: socket.socket, size: int) -> bytearray:
+    """
+    Receive exactly size bytes from a socket
+
+    Args:
+        sock: Socket to receive from
+        size: Number of bytes to read
+
+    Returns:
+        The buffer the bytes were received into
+
+    Raises:
+        ConnectionError: If the peer closes the connection first
+    """
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        count = sock.recv_into(view[received:])
+        if not count:
+            raise ConnectionError(f"Connection closed after {received} of {size} bytes")
+        received += count
+    return buffer
+
+
+def send_message(sock: socket.socket, data) -> None:
+    """
+    Send one length-prefixed message
+
+    Args:
+        sock: Socket to send through
+        data: JSON-serializable message
+    """
+    send_encoded(sock, encode_message(data))
+
+
+def send_encoded(sock: socket.socket, payload: bytes) -> None:
+    """
+    Send one length-prefixed message that is already encoded
+
+    Args:
+        sock: Socket to send through
+        payload: Output of encode_message, e.g. a cached response
+    """
+    sock.sendall(_LENGTH.pack(len(payload)) + payload)
+
+
+def _recv_payload(sock: socket.socket, max_size: int) -> bytearray:
+    """Receive one length-prefixed payload of at most max_size bytes"""
+    (length,) = _LENGTH.unpack(recv_exact(sock, _LENGTH.size))
+    if length > max_size:
+        raise ValueError(f"Message of {length} bytes exceeds limit")
+    return recv_exact(sock, length)
+
+
+def recv_message(sock: socket.socket):
+    """
+    Receive one length-prefixed message
+
+    Args:
+        sock: Socket to receive from
+
+    Returns:
+        The decoded message
+
+    Raises:
+        ConnectionError: If the connection closes mid-message
+        ValueError: If the length prefix exceeds MAX_MESSAGE_SIZE
+    """
+    # Both decoders accept the bytearray as is, so the payload is never copied
+    return decode_message(_recv_payload(sock, MAX_MESSAGE_SIZE))
+
+
+def recv_request(sock: socket.socket) -> dict:
+    """
+    Receive one request on the serving side of a connection
+
+    Oversized or non-object requests are rejected without being read or
+    parsed.
+
+    Args:
+        sock: Socket to receive from
+
+    Returns:
+        The decoded request
+
+    Raises:
+        ConnectionError: If the connection closes mid-message
+        ValueError: If the request exceeds MAX_REQUEST_SIZE or is not a
+            JSON object
+    """
+    payload = _recv_payload(sock, MAX_REQUEST_SIZE)
+    if payload[:1] != b'{':
+        raise ValueError("Request is not a JSON object")
+    return decode_message(payload)
@@ -3,9 +3,18 @@ Standalone Tracker Server Starter
 Run this script to start the tracker server independently
 """
 
-from Server.tracker import start_tracker_server
+import argparse
+
+from Server.tracker import start_tracker_server, STATE_FILE
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="P2P Video Streaming tracker server")
+    parser.add_argument('--state-file', default=STATE_FILE,
+                        help=f"file the tracker saves its peers and videos to (default: {STATE_FILE})")
+    parser.add_argument('--no-state', action='store_true',
+                        help="don't save or restore tracker state")
+    args = parser.parse_args()
+    
     print("=" * 60)
     print("P2P Video Streaming - Tracker Server")
     print("=" * 60)
@@ -13,7 +22,10 @@ if __name__ == "__main__":
     print("Press Ctrl+C to stop the server\n")
     
     try:
-        start_tracker_server(host='localhost', port=6000)
+        start_tracker_server(
+            host='localhost', port=6000,
+            state_file=None if args.no_state else args.state_file
+        )
     except KeyboardInterrupt:
         print("\n\nTracker server stopped.")
     except Exception as e: